@@ -0,0 +1,303 @@
+"""Benchmark time-to-reacquire after the tracked face leaves the frame
+
+Replays face exits against a simulated pan motor and compares the old
+scripted search (keep turning for 15 frames, turn the other way until
+frame 30, stop) with ReacquisitionPlanner.
+
+Exits come from recordings and/or generated scenarios:
+  --recordings exits.csv   rows of exit_id,t,face_deg: face angle relative to
+                           motor home, as written by
+                           enhanced_face_motor_controller.py --exit-log
+  --face-log face_log.txt  face.py log from a static camera, used to derive
+                           realistic walking speeds for generated exits
+
+Exits that both searches reacquire on the first search frame (the face was
+only partly out of view) say nothing about the search and are left out of
+the summary.
+
+    python benchmark_reacquisition.py --face-log face_log.txt
+"""
+import argparse
+import csv
+import os
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from reacquisition import ReacquisitionPlanner
+
+FPS = 30.0
+STEPS_PER_REV = 2048
+
+
+class Scenario:
+    """Face angle trajectory (steps) with the motor parked at motor_start"""
+
+    def __init__(self, name, times, positions, motor_start):
+        self.name = name
+        self.times = np.asarray(times, dtype=float)
+        self.positions = np.asarray(positions, dtype=float)
+        self.motor_start = motor_start
+
+    def face_at(self, t):
+        return float(np.interp(t, self.times, self.positions))
+
+    @property
+    def end_time(self):
+        return float(self.times[-1])
+
+
+class World:
+    """Camera on a pan motor; decides what the detector can see"""
+
+    def __init__(self, frame_width, fov_degrees, motor_limits, motor_velocity, face_width_px=120):
+        self.frame_width = frame_width
+        self.fov_degrees = fov_degrees
+        self.steps_per_pixel = (fov_degrees / frame_width) * (STEPS_PER_REV / 360.0)
+        self.half_fov_steps = (fov_degrees / 2.0) * STEPS_PER_REV / 360.0
+        self.face_half_steps = face_width_px / 2 * self.steps_per_pixel
+        self.motor_limits = motor_limits
+        self.motor_velocity = motor_velocity
+
+    def face_x(self, face_steps, motor_position):
+        """Face center column in the mirrored frame"""
+        return self.frame_width / 2 - (face_steps - motor_position) / self.steps_per_pixel
+
+    def detectable(self, face_steps, motor_position, roi=None):
+        """Face fully inside the frame (and inside the ROI strip, if given)"""
+        x = self.face_x(face_steps, motor_position)
+        half = self.face_half_steps / self.steps_per_pixel
+        x0, x1 = roi if roi is not None else (0, self.frame_width)
+        return x - half >= x0 and x + half <= x1
+
+    def move(self, motor_position, command, dt):
+        if command == 'R':
+            motor_position += self.motor_velocity * dt
+        elif command == 'L':
+            motor_position -= self.motor_velocity * dt
+        return min(max(motor_position, self.motor_limits['min']), self.motor_limits['max'])
+
+
+class LegacySearch:
+    """The frame-counting search from EnhancedFaceMotorController before the planner"""
+
+    def __init__(self, max_no_face_frames=15, stop_frame=30):
+        self.max_no_face_frames = max_no_face_frames
+        self.stop_frame = stop_frame
+
+    def start(self, last_direction):
+        self.no_face_timeout = 0
+        self.last_direction = last_direction
+        self.rotation_active = True
+
+    def step(self):
+        self.no_face_timeout += 1
+        if self.no_face_timeout < self.max_no_face_frames and self.rotation_active:
+            return self.last_direction, None
+        if self.no_face_timeout < self.stop_frame:
+            opposite_dir = 'L' if self.last_direction == 'R' else 'R'
+            if self.no_face_timeout == self.max_no_face_frames:
+                self.last_direction = opposite_dir
+            return opposite_dir, None
+        self.rotation_active = False
+        return 'S', None
+
+
+def leaves_frame(scenario, world):
+    """Whether the face leaves the view of a motor parked at motor_start"""
+    times = np.arange(scenario.times[0], scenario.end_time, 1.0 / FPS)
+    return any(not world.detectable(scenario.face_at(t), scenario.motor_start) for t in times)
+
+
+def run_scenario(scenario, world, policy, timeout):
+    """Return seconds from loss to reacquisition, or None if never found"""
+    dt = 1.0 / FPS
+    motor = scenario.motor_start
+    t = float(scenario.times[0])
+
+    planner = None
+    if policy == 'planner':
+        planner = ReacquisitionPlanner(world.frame_width, fov_degrees=world.fov_degrees,
+                                       search_velocity=world.motor_velocity)
+
+    # Watch the face with a parked motor until it leaves the frame
+    last_x = None
+    while t <= scenario.end_time:
+        face = scenario.face_at(t)
+        if not world.detectable(face, motor):
+            break
+        last_x = world.face_x(face, motor)
+        if planner:
+            planner.observe(last_x, motor, t)
+        t += dt
+    else:
+        return None  # Never left the frame
+
+    if last_x is None:
+        return None
+
+    # Legacy search had been turning toward the face while tracking
+    legacy = None
+    if policy == 'legacy':
+        legacy = LegacySearch()
+        legacy.start('R' if last_x < world.frame_width / 2 else 'L')
+    else:
+        planner.start(motor, world.motor_limits, t)
+
+    t_lost = t
+    roi = None
+    while t - t_lost < timeout:
+        face = scenario.face_at(t)
+        if planner and planner.active and not planner.use_full_frame():
+            visible = world.detectable(face, motor, roi)
+        else:
+            visible = world.detectable(face, motor)
+        if visible:
+            return t - t_lost
+
+        if legacy:
+            command, roi = legacy.step()
+        else:
+            action = planner.step(motor, t)
+            command, roi = action.command, action.roi
+
+        motor = world.move(motor, command, dt)
+        t += dt
+
+    return None
+
+
+def generated_scenarios(speeds, world):
+    """Exits at the given face speeds (steps/s), both directions, several endings"""
+    scenarios = []
+    for speed in speeds:
+        for direction in (1, -1):
+            for motor_start in (0.0, direction * 700.0):
+                times = [0.0]
+                positions = [motor_start]
+                # Walk out of the frame at constant speed
+                exit_time = (world.half_fov_steps + world.face_half_steps) / speed
+                for ending, profile in (('walk_on', [(exit_time + 1.5, speed)]),
+                                        ('stop', [(exit_time + 0.2, speed), (exit_time + 6.0, 0.0)]),
+                                        ('turn_back', [(exit_time + 0.6, speed), (exit_time + 6.0, -speed / 2)])):
+                    t_prev, p_prev = times[0], positions[0]
+                    ts, ps = [t_prev], [p_prev]
+                    for t_end, v in profile:
+                        p_prev += direction * v * (t_end - t_prev)
+                        t_prev = t_end
+                        ts.append(t_prev)
+                        ps.append(p_prev)
+                    ts.append(t_prev + 10.0)
+                    ps.append(p_prev)  # Stand still afterwards
+                    name = f"{ending}_{'R' if direction > 0 else 'L'}_{speed:.0f}sps_from{motor_start:+.0f}"
+                    scenarios.append(Scenario(name, ts, ps, motor_start))
+    return scenarios
+
+
+def load_recordings(path):
+    """Load recorded exits: CSV with exit_id,t,face_deg columns"""
+    rows = defaultdict(list)
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            rows[row['exit_id']].append((float(row['t']), float(row['face_deg'])))
+
+    scenarios = []
+    for exit_id, samples in rows.items():
+        samples.sort()
+        times = [s[0] for s in samples]
+        positions = [s[1] * STEPS_PER_REV / 360.0 for s in samples]
+        scenarios.append(Scenario(f"recorded_{exit_id}", times, positions, positions[0]))
+    return scenarios
+
+
+def speeds_from_face_log(path, frame_width, fov_degrees):
+    """Face speeds (steps/s) at the 50th/90th/99th percentile of a face.py log"""
+    samples = []
+    with open(path) as f:
+        next(f)  # Header
+        for line in f:
+            parts = [p.strip() for p in line.split(',')]
+            if len(parts) < 5:
+                continue
+            stamp = datetime.strptime(parts[0], "%Y-%m-%d %H:%M:%S").timestamp()
+            samples.append((stamp, int(parts[1]) + int(parts[3]) / 2))
+
+    # Timestamps have 1s resolution, so compare per-second mean positions
+    per_second = defaultdict(list)
+    for stamp, x in samples:
+        per_second[stamp].append(x)
+    stamps = sorted(per_second)
+    means = [np.mean(per_second[s]) for s in stamps]
+    px_speeds = [abs(b - a) / (t1 - t0) for (t0, a), (t1, b) in zip(zip(stamps, means), zip(stamps[1:], means[1:]))]
+    if not px_speeds:
+        return []
+
+    steps_per_px = (fov_degrees / frame_width) * (STEPS_PER_REV / 360.0)
+    # Slow percentiles clamp to the same floor, keep each speed once
+    speeds = {round(max(20.0, float(np.percentile(px_speeds, q)) * steps_per_px)) for q in (50, 90, 99)}
+    return sorted(float(s) for s in speeds)
+
+
+def summarize(name, results, timeout):
+    found = [r for r in results if r is not None]
+    rate = 100.0 * len(found) / len(results) if results else 0.0
+    # Missed exits count as the full timeout so medians stay comparable
+    padded = np.array([r if r is not None else timeout for r in results])
+    print(f"{name:<8} reacquired {len(found):>3}/{len(results):<3} ({rate:5.1f}%)  "
+          f"median {np.median(padded):5.2f}s  p90 {np.percentile(padded, 90):5.2f}s  "
+          f"mean {padded.mean():5.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recordings', help="CSV of recorded exits (exit_id,t,face_deg)")
+    parser.add_argument('--face-log', default='face_log.txt' if os.path.exists('face_log.txt') else None,
+                        help="face.py log used to derive walking speeds")
+    parser.add_argument('--frame-width', type=int, default=640)
+    parser.add_argument('--fov', type=float, default=60.0, help="Horizontal field of view in degrees")
+    parser.add_argument('--motor-velocity', type=float, default=300.0, help="Search speed in steps/s")
+    parser.add_argument('--timeout', type=float, default=8.0, help="Seconds before an exit counts as lost")
+    parser.add_argument('--verbose', action='store_true', help="Print every scenario")
+    args = parser.parse_args()
+
+    limits = {'min': -1024, 'max': 1024}
+    world = World(args.frame_width, args.fov, limits, args.motor_velocity)
+
+    speeds = [150.0, 300.0, 500.0]
+    if args.face_log:
+        logged = speeds_from_face_log(args.face_log, args.frame_width, args.fov)
+        print(f"Speeds from {args.face_log}: {', '.join(f'{s:.0f}' for s in logged)} steps/s")
+        speeds = sorted(set(speeds) | set(logged))
+
+    scenarios = generated_scenarios(speeds, world)
+    if args.recordings:
+        recorded = load_recordings(args.recordings)
+        leaving = [s for s in recorded if leaves_frame(s, world)]
+        print(f"{len(leaving)}/{len(recorded)} recorded exits leave the frame of a parked motor")
+        scenarios += leaving
+
+    one_frame = 1.5 / FPS
+    results = {'legacy': [], 'planner': []}
+    trivial = 0
+    for scenario in scenarios:
+        row = {policy: run_scenario(scenario, world, policy, args.timeout) for policy in results}
+        caught_at_once = all(r is not None and r < one_frame for r in row.values())
+        if args.verbose:
+            text = ['lost' if r is None else f"{r:.2f}s" for r in row.values()]
+            note = '  (first frame, excluded)' if caught_at_once else ''
+            print(f"{scenario.name:<40} legacy {text[0]:>6}  planner {text[1]:>6}{note}")
+        if caught_at_once:
+            trivial += 1
+            continue
+        for policy, elapsed in row.items():
+            results[policy].append(elapsed)
+
+    print(f"{len(scenarios) - trivial} exits ({trivial} caught by both on the first search frame excluded), "
+          f"{args.fov:.0f}° FOV, search at {args.motor_velocity:.0f} steps/s")
+    for policy, policy_results in results.items():
+        summarize(policy, policy_results, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
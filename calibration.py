@@ -0,0 +1,237 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from motion_protocol import CMD_MOVE_BY, CMD_MOVE_TO, FLAG_MOVING
+
+
+class PixelStepModel:
+    """Linear model of image shift (pixels) per motor step for one lens/resolution
+
+    pixels_per_step is signed and measured on mirrored frames, so it maps
+    directly onto the controller's error: moving `steps` shifts the scene by
+    pixels_per_step * steps pixels.
+    """
+
+    def __init__(self, frame_width, frame_height, pixels_per_step, offset_px=0.0,
+                 rms_px=0.0, samples=0, created=None):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.pixels_per_step = pixels_per_step
+        self.offset_px = offset_px
+        self.rms_px = rms_px
+        self.samples = samples
+        self.created = created or time.strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def key(self):
+        return f"{self.frame_width}x{self.frame_height}"
+
+    def steps_for_error(self, error_px):
+        """Steps that move a face `error_px` from center onto the center line"""
+        return int(round(-error_px / self.pixels_per_step))
+
+    def to_dict(self):
+        return {
+            'pixels_per_step': self.pixels_per_step,
+            'offset_px': self.offset_px,
+            'rms_px': self.rms_px,
+            'samples': self.samples,
+            'created': self.created,
+        }
+
+    def save(self, path):
+        """Store the model under its resolution key, keeping other resolutions"""
+        models = self._read_models(path) or {}
+        models[self.key] = self.to_dict()
+        with open(path, 'w') as f:
+            json.dump(models, f, indent=2)
+
+    @staticmethod
+    def _read_models(path):
+        """Models by resolution key, or None if the file is missing or unreadable"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                models = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable calibration file {path}: {e}")
+            return None
+        if not isinstance(models, dict):
+            print(f"Ignoring calibration file {path}: expected an object keyed by resolution")
+            return None
+        return models
+
+    @classmethod
+    def load(cls, path, frame_width, frame_height):
+        """Load the model for this resolution, or None if it was never calibrated"""
+        models = cls._read_models(path)
+        if models is None:
+            return None
+        entry = models.get(f"{frame_width}x{frame_height}")
+        if entry is None:
+            return None
+        try:
+            pixels_per_step = float(entry['pixels_per_step'])
+            model = cls(frame_width, frame_height, pixels_per_step,
+                        offset_px=float(entry.get('offset_px', 0.0)),
+                        rms_px=float(entry.get('rms_px', 0.0)),
+                        samples=int(entry.get('samples', 0)), created=entry.get('created'))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring malformed calibration entry in {path}: {e!r}")
+            return None
+        if pixels_per_step == 0 or not np.isfinite(pixels_per_step):
+            print(f"Ignoring calibration entry in {path}: pixels_per_step is {pixels_per_step}")
+            return None
+        return model
+
+
+class PixelStepCalibrator:
+    """Fits a PixelStepModel by moving the motor and watching a static scene
+
+    The motor is moved by known step counts with framed MOVE_BY commands,
+    alternating direction. Before each measured move an unmeasured take-up
+    move in the same direction closes the gear backlash, so every
+    measurement starts with the gears engaged. After each move the global
+    image shift is measured with phase correlation, which works on any
+    textured static target, then shift vs. the position change reported by
+    the firmware is fitted with a line.
+
+    The firmware clamps goals at the motor limits without an error, so the
+    motor is first moved far enough from the limits for the whole sequence,
+    and returned to where it started afterwards.
+    """
+
+    def __init__(self, controller, moves=(40, -40, 80, -80, 160, -160, -40, 40, -80, 80, -160, 160),
+                 backlash_steps=24, settle_time=0.15, flush_frames=4, move_timeout=3.0,
+                 min_response=0.05, max_rms_px=2.0):
+        self.controller = controller
+        self.moves = moves
+        self.backlash_steps = backlash_steps  # Take-up move, above the gear slack of a 28BYJ-48
+        self.settle_time = settle_time        # Seconds for vibration to die down
+        self.flush_frames = flush_frames      # Stale frames dropped from the camera buffer
+        self.move_timeout = move_timeout
+        self.min_response = min_response      # Phase correlation confidence threshold
+        self.max_rms_px = max_rms_px          # Fits noisier than this are rejected
+
+        self._window = None
+
+    def _grab_gray(self):
+        """Fresh mirrored grayscale frame as float32"""
+        frame = None
+        for _ in range(self.flush_frames + 1):
+            ret, frame = self.controller.cap.read()
+            if not ret:
+                raise RuntimeError("Failed to capture frame during calibration")
+        frame = cv2.flip(frame, 1)  # Same orientation the controller tracks in
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        if self._window is None or self._window.shape != gray.shape:
+            self._window = cv2.createHanningWindow((gray.shape[1], gray.shape[0]), cv2.CV_32F)
+        return gray
+
+    def _wait_for_protocol(self, timeout=2.0):
+        """Negotiate the framed protocol and return the first MotorStatus"""
+        self.controller.request_protocol_handshake()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = self.controller.motor_status
+            if self.controller.protocol_version and status is not None:
+                return status
+            time.sleep(0.01)
+        raise RuntimeError("Calibration needs firmware with the framed motion protocol")
+
+    def _command(self, cmd, value):
+        """Send a motion frame, wait for the arrival report and return the position"""
+        seq = self.controller.send_frame(cmd, value)
+        if seq is None:
+            raise RuntimeError("Serial queue is full")
+        deadline = time.time() + self.move_timeout
+        while time.time() < deadline:
+            status = self.controller.motor_status  # Read once, the serial thread swaps it
+            if status is not None and status.seq == seq and not status.flags & FLAG_MOVING:
+                time.sleep(self.settle_time)
+                return status.position
+            time.sleep(0.005)
+        raise RuntimeError(f"Motor did not finish a move ({value:+d})")
+
+    def _move(self, steps):
+        """Move by `steps`; returns the position the firmware reports on arrival"""
+        return self._command(CMD_MOVE_BY, steps)
+
+    def _move_to(self, position):
+        return self._command(CMD_MOVE_TO, position)
+
+    def _travel(self):
+        """Lowest and highest offset from the start reached by the move sequence"""
+        offset, low, high = 0, 0, 0
+        for steps in self.moves:
+            if self.backlash_steps:
+                offset += self.backlash_steps if steps > 0 else -self.backlash_steps
+                low, high = min(low, offset), max(high, offset)
+            offset += steps
+            low, high = min(low, offset), max(high, offset)
+        return low, high
+
+    def _safe_start(self, status):
+        """Start position that keeps the whole sequence inside the motor limits"""
+        low, high = self._travel()
+        if high - low > status.max_position - status.min_position:
+            raise RuntimeError(f"Calibration needs {high - low} steps of travel, "
+                               f"motor limits allow {status.max_position - status.min_position}")
+        return min(max(status.position, status.min_position - low), status.max_position - high)
+
+    def run(self):
+        """Run the calibration moves and return the fitted PixelStepModel"""
+        status = self._wait_for_protocol()
+        home = status.position
+
+        steps_list, shifts = [], []
+        try:
+            position = home
+            start = self._safe_start(status)
+            if start != home:
+                print(f"  Moving from {home} to {start} to stay inside the motor limits")
+                position = self._move_to(start)
+
+            for steps in self.moves:
+                if self.backlash_steps:
+                    # Reversing leaves the slack open; close it before measuring
+                    position = self._move(self.backlash_steps if steps > 0 else -self.backlash_steps)
+                reference = self._grab_gray()
+                before = position
+                position = self._move(steps)
+                moved = position - before  # Goals past a limit are clamped silently
+                current = self._grab_gray()
+                (dx, dy), response = cv2.phaseCorrelate(reference, current, self._window)
+                print(f"  {moved:+5d} steps -> {dx:+7.2f}px (confidence {response:.2f})")
+                if moved and response >= self.min_response:
+                    steps_list.append(moved)
+                    shifts.append(dx)
+        finally:
+            try:
+                self._move_to(home)
+            except RuntimeError as e:
+                print(f"  Could not return to position {home}: {e}")
+
+        if len(steps_list) < 4:
+            raise RuntimeError("Too few confident measurements; point the camera at a static, textured scene")
+
+        steps_arr = np.array(steps_list, dtype=float)
+        shifts_arr = np.array(shifts, dtype=float)
+        slope, offset = np.polyfit(steps_arr, shifts_arr, 1)
+        residuals = shifts_arr - (slope * steps_arr + offset)
+        rms = float(np.sqrt(np.mean(residuals ** 2)))
+
+        if abs(slope) < 1e-3:
+            raise RuntimeError("Image did not move with the motor; check wiring and target")
+        if rms > self.max_rms_px:
+            raise RuntimeError(f"Fit residual {rms:.1f}px exceeds {self.max_rms_px:.1f}px; "
+                               f"check for motion in the scene or a slipping mount")
+
+        return PixelStepModel(self.controller.frame_width, self.controller.frame_height,
+                              float(slope), offset_px=float(offset), rms_px=rms,
+                              samples=len(steps_list))
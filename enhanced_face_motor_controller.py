@@ -1,3 +1,4 @@
+import argparse
 import cv2
 import serial
 import time
@@ -5,22 +6,49 @@ import threading
 import queue
 from collections import deque
 import numpy as np
+from multi_face_tracker import MultiFaceTracker
+from reacquisition import ExitRecorder, ReacquisitionPlanner
+from ui_layer import HeadlessCommandSource, OverlayRenderer
+from motion_protocol import (CMD_INFO, CMD_MOVE_BY, CMD_VELOCITY, FLAG_BAD_FRAME, FLAG_MOVING,
+                             FrameEncoder, MotorStatus, ResponseParser)
+from calibration import PixelStepCalibrator, PixelStepModel
 
 class EnhancedFaceMotorController:
-    def __init__(self, com_port='COM10', baud_rate=9600):
-        # Serial communication setup
+    def __init__(self, com_port='COM10', baud_rate=9600, target_policy='sticky',
+                 arduino=None, capture=None, use_framed_protocol=True,
+                 headless=False, control_port=None, ui_hz=10.0, camera_fov_deg=60.0,
+                 calibration_file='calibration.json', exit_log=None):
+        # Serial communication setup (bounded so a dead port cannot grow the queue forever)
         self.arduino = None
-        self.serial_queue = queue.Queue()
-        self.response_queue = queue.Queue()
-        self.connect_arduino(com_port, baud_rate)
+        self.serial_queue = queue.Queue(maxsize=64)
+        self.response_queue = queue.Queue(maxsize=64)
+        self.response_parser = ResponseParser()
+        
+        # Framed motion protocol, enabled once the firmware answers the handshake
+        self.use_framed_protocol = use_framed_protocol
+        self.protocol_version = 0  # 0 = legacy single-character commands
+        self.frame_encoder = FrameEncoder()
+        self.motor_status = None  # Latest MotorStatus, replaced in one assignment
+        self._last_velocity = None
+        self._last_velocity_time = 0.0
+        self.min_velocity = 60        # steps/s near center
+        self.max_velocity = 600       # steps/s when far (firmware caps at ~614)
+        self.search_velocity = 300    # steps/s while searching for a lost face
+        self.velocity_tolerance = 20  # Resend only when velocity changes this much
+        self.velocity_keepalive = 0.2 # Seconds, firmware stops after 0.5s without one
+        if arduino is not None:
+            # Pre-opened or simulated serial port
+            self.arduino = arduino
+        else:
+            self.connect_arduino(com_port, baud_rate)
         
         # Face detection setup
         self.face_cascade = cv2.CascadeClassifier('haarcascade_frontalface_default.xml')
         if self.face_cascade.empty():
             self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         
-        # Camera setup
-        self.cap = cv2.VideoCapture(0)
+        # Camera setup (any object with the VideoCapture read/get/set/release API)
+        self.cap = capture if capture is not None else cv2.VideoCapture(0)
         self.setup_camera()
         
         # Tracking parameters
@@ -30,14 +58,40 @@ class EnhancedFaceMotorController:
         self.last_command_time = time.time()
         self.command_interval = 0.01  # Very fast command rate for aggressive continuous tracking
         
+        # Multi-face tracking with stable IDs (sticky/largest/center target policy)
+        self.face_tracker = MultiFaceTracker(self.frame_width, self.frame_height, policy=target_policy)
+        self.target_id = None
+        
         # Continuous tracking parameters
         self.last_direction = 'S'
         self.continuous_movement = False
         self.movement_momentum = 0
         self.no_face_timeout = 0
-        self.max_no_face_frames = 15  # More frames before stopping
         self.rotation_active = False
         
+        # Model-based search when the face is lost (uses motor position and FOV)
+        self.reacquisition = ReacquisitionPlanner(self.frame_width, fov_degrees=camera_fov_deg,
+                                                  search_velocity=self.search_velocity)
+        self.reacquire_grace_frames = 2  # Missed frames before smoothing history is dropped
+        self._search_roi = None
+        # Optional log of real exits for benchmark_reacquisition.py --recordings
+        self.exit_recorder = ExitRecorder(exit_log) if exit_log else None
+        
+        # Closed-loop step targeting from a pixel-per-step calibration (framed protocol only)
+        self.calibration_file = calibration_file
+        self.pixel_step_model = PixelStepModel.load(calibration_file, self.frame_width, self.frame_height)
+        if self.pixel_step_model:
+            print(f"Loaded calibration: {self.pixel_step_model.pixels_per_step:+.3f} px/step")
+        self.step_deadband = 8          # Pixels, same as the velocity controller
+        self.max_move_steps = 400       # Cap for a single targeting move
+        self.move_timeout = 1.5         # Seconds before a move is considered finished
+        self.settle_frames_required = 2 # Frames to skip after a move (camera latency)
+        self._pending_move_seq = None
+        self._pending_move_steps = 0
+        self._pending_move_time = 0.0
+        self._pending_move_center_x = 0  # Target column when the move was sent
+        self._settle_frames = 0
+        
         # Centering stability (require N consecutive centered frames before stopping)
         self.centered_frames = 0
         self.centered_required = 5  # frames
@@ -54,6 +108,11 @@ class EnhancedFaceMotorController:
         self.motor_limits = {'min': -1024, 'max': 1024}
         self.connection_status = False
         
+        # UI: cached overlay when displaying, stdin/socket commands when headless
+        self.headless = headless
+        self.overlay = OverlayRenderer(self.frame_width, self.frame_height, ui_hz=ui_hz)
+        self.command_source = HeadlessCommandSource(control_port=control_port) if headless else None
+        
         # Performance metrics
         self.frame_count = 0
         self.start_time = time.time()
@@ -61,6 +120,7 @@ class EnhancedFaceMotorController:
         self.fps = 0
         
         # Start serial communication thread
+        self._stop_event = threading.Event()
         self.serial_thread = threading.Thread(target=self.serial_communication_handler, daemon=True)
         self.serial_thread.start()
         
@@ -96,22 +156,22 @@ class EnhancedFaceMotorController:
     
     def serial_communication_handler(self):
         """Handle serial communication in separate thread"""
-        while True:
+        while not self._stop_event.is_set():
             try:
                 # Send commands from queue
                 if not self.serial_queue.empty() and self.arduino and self.arduino.is_open:
                     command = self.serial_queue.get_nowait()
-                    self.arduino.write(command.encode())
+                    data = command if isinstance(command, bytes) else command.encode()
+                    self.arduino.write(data)
                     self.arduino.flush()
                 
-                # Read responses
+                # Read responses (text lines and binary status frames share the line)
                 if self.arduino and self.arduino.is_open and self.arduino.in_waiting > 0:
-                    try:
-                        response = self.arduino.readline().decode().strip()
-                        if response:
-                            self.process_arduino_response(response)
-                    except UnicodeDecodeError:
-                        pass  # Skip invalid characters
+                    for item in self.response_parser.feed(self.arduino.read(self.arduino.in_waiting)):
+                        if isinstance(item, MotorStatus):
+                            self.process_motor_status(item)
+                        else:
+                            self.process_arduino_response(item)
                 
                 time.sleep(0.001)  # Small delay to prevent excessive CPU usage
                 
@@ -122,7 +182,7 @@ class EnhancedFaceMotorController:
     def process_arduino_response(self, response):
         """Process responses from Arduino"""
         if ':' in response:
-            parts = response.split(':')
+            parts = response.split(':', 1)
             command_type = parts[0]
             
             if command_type in ['L', 'R']:
@@ -145,8 +205,52 @@ class EnhancedFaceMotorController:
             
             self.connection_status = True
     
-    def detect_and_track_face(self, frame):
-        """Enhanced face detection with preprocessing"""
+    def process_motor_status(self, status):
+        """Process a binary status reply from the framed protocol"""
+        if status.flags & FLAG_BAD_FRAME:
+            return
+        
+        if not self.protocol_version:
+            print(f"Framed motion protocol v{status.version} enabled")
+        self.protocol_version = status.version
+        
+        self.motor_status = status
+        self.motor_position = status.position
+        self.motor_limits['min'] = status.min_position
+        self.motor_limits['max'] = status.max_position
+        self.connection_status = True
+    
+    def request_protocol_handshake(self):
+        """Ask for motor info in both protocols
+        
+        Legacy firmware answers the 'I' and ignores the frame (it arrives
+        inside the command cooldown); framed firmware also replies with a
+        status frame, which switches the controller to the framed protocol.
+        """
+        self._queue_serial('I')
+        if self.use_framed_protocol:
+            self.send_frame(CMD_INFO)
+    
+    def move_finished(self, seq):
+        """Whether the latest status answers frame `seq` and the motor has stopped"""
+        status = self.motor_status  # Read once, the serial thread swaps it
+        return status is not None and status.seq == seq and not status.flags & FLAG_MOVING
+    
+    def send_frame(self, cmd, value=None):
+        """Queue a framed command; returns its sequence number, or None if dropped"""
+        seq, frame = self.frame_encoder.encode(cmd, value)
+        return seq if self._queue_serial(frame) else None
+    
+    def detect_and_track_face(self, frame, roi=None):
+        """Enhanced face detection with preprocessing
+        
+        roi is an optional (x0, x1) column range; only that strip is searched.
+        """
+        x0 = 0
+        if roi is not None:
+            x0, x1 = roi
+            frame = frame[:, x0:x1]
+        
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         # Preprocessing for better detection
@@ -163,6 +267,9 @@ class EnhancedFaceMotorController:
             flags=cv2.CASCADE_SCALE_IMAGE
         )
         
+        if x0 and len(faces) > 0:
+            faces = faces + np.array([x0, 0, 0, 0])
+        
         return faces
     
     def smooth_face_position(self, face_center_x):
@@ -270,10 +377,126 @@ class EnhancedFaceMotorController:
         current_time = time.time()
         
         if current_time - self.last_command_time >= self.command_interval:
-            if not self.serial_queue.full():
-                self.serial_queue.put(command)
+            if self._queue_serial(command):
                 self.last_command_time = current_time
     
+    def send_motion_command(self, command, intensity, error):
+        """Send one control decision using the best protocol the firmware supports
+        
+        With the framed protocol a single velocity command replaces the stream
+        of L/R bytes; it is only resent when the velocity changes or as a
+        keepalive for the firmware watchdog.
+        """
+        if not self.protocol_version:
+            self.send_motor_command(command)
+            return
+        
+        if command in ('L', 'R'):
+            speed = self.search_velocity if intensity == 3 else self._velocity_for_error(abs(error))
+            velocity = speed if command == 'R' else -speed
+        else:
+            velocity = 0
+        
+        current_time = time.time()
+        changed = (self._last_velocity is None
+                   or (velocity == 0) != (self._last_velocity == 0)
+                   or abs(velocity - self._last_velocity) >= self.velocity_tolerance)
+        keepalive_due = velocity != 0 and current_time - self._last_velocity_time >= self.velocity_keepalive
+        
+        if changed or keepalive_due:
+            if self.send_frame(CMD_VELOCITY, velocity) is not None:
+                self._last_velocity = velocity
+                self._last_velocity_time = current_time
+    
+    def step_targeting_enabled(self):
+        """Center with one counted move per decision when calibrated and framed"""
+        return self.pixel_step_model is not None and self.protocol_version >= 1
+    
+    def calculate_step_command(self, face_center_x):
+        """Closed-loop step targeting using the pixel-per-step calibration
+        
+        Sends a single MOVE_BY for the steps needed to center the face, waits
+        for the firmware to report arrival, lets the camera settle for a few
+        frames, then corrects any remaining error the same way.
+        """
+        error = face_center_x - self.frame_center_x
+        current_time = time.time()
+        
+        # Stop any velocity motion left over from a search
+        if self._last_velocity:
+            self.send_motion_command('S', 0, 0)
+        
+        if self._update_pending_move(current_time):
+            direction = 'R' if self._pending_move_steps > 0 else 'L'
+            return direction, f"🎯 MOVING {self._pending_move_steps:+d} STEPS", 4, error
+        
+        if self._settle_frames > 0:
+            self._settle_frames -= 1
+            return 'S', "⏳ SETTLING AFTER MOVE", 0, error
+        
+        if abs(error) <= self.step_deadband:
+            self.rotation_active = False
+            self.last_direction = 'S'
+            return 'S', "✅ PERFECTLY CENTERED", 0, error
+        
+        steps = self.pixel_step_model.steps_for_error(error)
+        steps = max(-self.max_move_steps, min(self.max_move_steps, steps))
+        # Keep the goal inside the motor limits
+        steps = max(self.motor_limits['min'] - self.motor_position,
+                    min(self.motor_limits['max'] - self.motor_position, steps))
+        if steps == 0:
+            return 'S', "⛔ AT MOTOR LIMIT", 0, error
+        
+        seq = self.send_frame(CMD_MOVE_BY, steps)
+        if seq is not None:
+            self._pending_move_seq = seq
+            self._pending_move_steps = steps
+            self._pending_move_time = current_time
+            self._pending_move_center_x = face_center_x
+        
+        direction = 'R' if steps > 0 else 'L'
+        self.rotation_active = True
+        self.last_direction = direction
+        return direction, f"🎯 STEP MOVE {steps:+d} ({error:+d}px)", 4, error
+    
+    def _update_pending_move(self, current_time):
+        """Whether a targeting move is still running; completes it on arrival or timeout"""
+        if self._pending_move_seq is None:
+            return False
+        if (not self.move_finished(self._pending_move_seq)
+                and current_time - self._pending_move_time < self.move_timeout):
+            return True
+        
+        self._pending_move_seq = None
+        self._settle_frames = self.settle_frames_required
+        self.face_history.clear()  # Positions from before the move are stale
+        
+        # The scene shifted by about pixels_per_step * steps. Move the tracks
+        # with it so the target keeps its ID; the part of the shift already
+        # seen during the move is not applied twice.
+        if self.pixel_step_model:
+            expected_x = (self._pending_move_center_x
+                          + self.pixel_step_model.pixels_per_step * self._pending_move_steps)
+            track = self.face_tracker.get_track(self.target_id)
+            if track is not None:
+                self.face_tracker.shift(expected_x - track.center[0])
+            else:
+                self.face_tracker.shift(expected_x - self._pending_move_center_x)
+        return False
+    
+    def _velocity_for_error(self, abs_error):
+        """Map pixel error to motor velocity, same 0..200px ramp as the command rate"""
+        frac = max(0.0, min(float(abs_error), 200.0)) / 200.0
+        return int(self.min_velocity + frac * (self.max_velocity - self.min_velocity))
+    
+    def _queue_serial(self, command):
+        """Queue a command string or frame for the serial thread, dropping it when full"""
+        try:
+            self.serial_queue.put_nowait(command)
+            return True
+        except queue.Full:
+            return False
+    
     def update_fps(self):
         """Update FPS calculation"""
         self.frame_count += 1
@@ -286,65 +509,133 @@ class EnhancedFaceMotorController:
             self.last_fps_update = current_time
     
     def draw_enhanced_ui(self, frame, faces, command, status, intensity, error):
-        """Draw comprehensive tracking interface"""
-        # Draw reference lines
-        cv2.line(frame, (self.frame_center_x, 0), (self.frame_center_x, self.frame_height), (0, 255, 255), 1)
-        
-        # Draw deadband zone
-        deadband_left = self.frame_center_x - self.deadband
-        deadband_right = self.frame_center_x + self.deadband
-        cv2.rectangle(frame, (deadband_left, 0), (deadband_right, self.frame_height), (0, 255, 0), 1)
-        
-        # Draw faces with enhanced information
-        for i, (x, y, w, h) in enumerate(faces):
-            # Face rectangle with confidence-based color
-            confidence_color = (0, 255, 0) if w*h > 5000 else (0, 165, 255)  # Green for high confidence
-            cv2.rectangle(frame, (x, y), (x + w, y + h), confidence_color, 2)
+        """Draw comprehensive tracking interface (static parts are cached by the renderer)"""
+        self.overlay.draw(frame, faces, self.frame_center_x, self.deadband, status, error,
+                          self.motor_position, command, self.connection_status, self.fps)
+    
+    def process_frame(self, frame):
+        """Run detection, tracking and motor control for one camera frame
+        
+        Returns the mirrored frame and the values needed to draw the UI.
+        """
+        # Flip for mirror effect
+        frame = cv2.flip(frame, 1)
+        current_time = time.time()
+        
+        # Finish a targeting move before tracking, so the tracker sees its shift
+        move_running = self._update_pending_move(current_time)
+        if self._settle_frames > 0 and not move_running:
+            # Buffered camera frames still show the scene from before the move
+            self._settle_frames -= 1
+            self.update_fps()
+            return frame, [], 'S', "⏳ SETTLING AFTER MOVE", 0, 0
+        
+        # Detect faces (only the expected re-entry strip on most search frames)
+        roi = None
+        if self.reacquisition.active and not self.reacquisition.use_full_frame():
+            roi = self._search_roi
+        faces = self.detect_and_track_face(frame, roi)
+        
+        # Initialize defaults
+        command = 'S'
+        status = "No face detected"
+        intensity = 0
+        error = 0
+        
+        # Associate detections to tracks and pick the target
+        target = self.face_tracker.update(faces)
+        
+        if target is not None:
+            # Smoothing history belongs to one person only
+            if target.track_id != self.target_id:
+                self.face_history.clear()
+                self.reacquisition.clear_history()
+                self.target_id = target.track_id
+            
+            face_center_x = target.center[0]
+            
+            step_mode = self.step_targeting_enabled()
+            if step_mode:
+                command, status, intensity, error = self.calculate_step_command(face_center_x)
+            else:
+                command, status, intensity, error = self.calculate_motor_command(face_center_x)
+            faces = [target.box]  # Only show the tracked face
+            
+            # Remember where the face was for reacquisition. During a targeting
+            # move motor_position is the pre-move value while the image shifts,
+            # which would look like face motion, so those sightings are skipped.
+            if not move_running:
+                self.reacquisition.observe(face_center_x, self.motor_position, current_time)
+                if self.exit_recorder:
+                    self.exit_recorder.sighting(
+                        self.reacquisition.face_position_steps(face_center_x, self.motor_position),
+                        current_time)
+            elif self.reacquisition.active:
+                self.reacquisition.reset()  # Face found, the search is over
+            self._search_roi = None
+            
+            # Reset no-face timeout
+            self.no_face_timeout = 0
+        elif self.no_face_timeout < self.reacquire_grace_frames and (
+                move_running or self.face_tracker.get_track(self.target_id) is not None):
+            # Target track still alive, so this is a detector dropout rather
+            # than the face leaving: let a targeting move finish, else hold
+            self.no_face_timeout += 1
+            if self.exit_recorder:
+                self.exit_recorder.missed(current_time)
+            if move_running:
+                step_mode = True  # Nothing to send, the move is under way
+                command = 'R' if self._pending_move_steps > 0 else 'L'
+                status = f"🎯 MOVING {self._pending_move_steps:+d} STEPS (FACE MISSED)"
+                intensity = 4
+            else:
+                step_mode = False
+                status = "⏸️ TARGET MISSED - HOLDING"
+        else:
+            # Handle no face detected - search where the face is predicted to be
+            step_mode = False
+            self._pending_move_seq = None  # Search commands replace any targeting move
+            self.no_face_timeout += 1
+            
+            if not self.reacquisition.active:
+                self.reacquisition.start(self.motor_position, self.motor_limits, current_time)
+            if self.exit_recorder:
+                self.exit_recorder.missed(current_time)
             
-            # Face center
-            face_center_x = x + w // 2
-            face_center_y = y + h // 2
-            cv2.circle(frame, (face_center_x, face_center_y), 3, (0, 0, 255), -1)
+            action = self.reacquisition.step(self.motor_position, current_time)
+            command = action.command
+            status = action.status
+            intensity = 3 if command != 'S' else 0  # Search speed
+            error = 0
+            self._search_roi = action.roi
             
-            # Face size and position info
-            cv2.putText(frame, f'Face {i+1} ({w}x{h})', (x, y-10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, confidence_color, 1)
-        
-        # Status panel background
-        cv2.rectangle(frame, (5, 5), (400, 160), (0, 0, 0), -1)
-        cv2.rectangle(frame, (5, 5), (400, 160), (255, 255, 255), 1)
-        
-        # Status information
-        y_offset = 25
-        cv2.putText(frame, f"Status: {status}", (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        
-        y_offset += 25
-        cv2.putText(frame, f"Error: {error:+d}px | Deadband: ±{self.deadband}", 
-                   (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        y_offset += 20
-        cv2.putText(frame, f"Motor Pos: {self.motor_position} | Cmd: {command}", 
-                   (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # Connection and performance info
-        y_offset += 20
-        conn_color = (0, 255, 0) if self.connection_status else (0, 0, 255)
-        conn_status = "Connected" if self.connection_status else "Disconnected"
-        cv2.putText(frame, f"Arduino: {conn_status} | FPS: {self.fps:.1f}", 
-                   (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.5, conn_color, 1)
-        
-        # Controls help
-        y_offset += 20
-        cv2.putText(frame, "Controls: Q=Quit, R=Reset, H=Home, I=Info", 
-                   (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+            if action.phase in ('idle', 'done'):
+                self.continuous_movement = False
+                self.rotation_active = False
+                self.last_direction = 'S'
+            elif command != 'S':
+                self.last_direction = command
+            
+            # Brief detector dropouts keep the smoothing history
+            if self.no_face_timeout > self.reacquire_grace_frames:
+                self.face_history.clear()
+        
+        # Send motor command (step targeting already sent its move)
+        if not step_mode:
+            self.send_motion_command(command, intensity, error)
+        
+        # Update performance metrics
+        self.update_fps()
+        
+        return frame, faces, command, status, intensity, error
     
     def run(self):
         """Main tracking loop with enhanced performance"""
         print("Starting Enhanced Face Motor Controller...")
         print("Commands: Q=Quit, R=Reset tracking, H=Home motor, I=Motor info")
         
-        # Request initial motor info
-        self.send_motor_command('I')
+        # Request initial motor info and negotiate the motion protocol
+        self.request_protocol_handshake()
         
         try:
             while True:
@@ -353,90 +644,22 @@ class EnhancedFaceMotorController:
                     print("Failed to capture frame")
                     break
                 
-                # Flip for mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Detect faces
-                faces = self.detect_and_track_face(frame)
-                
-                # Initialize defaults
-                command = 'S'
-                status = "No face detected"
-                intensity = 0
-                error = 0
+                frame, faces, command, status, intensity, error = self.process_frame(frame)
                 
-                if len(faces) > 0:
-                    # Use largest face
-                    largest_face = max(faces, key=lambda f: f[2] * f[3])
-                    x, y, w, h = largest_face
-                    face_center_x = x + w // 2
-                    
-                    command, status, intensity, error = self.calculate_motor_command(face_center_x)
-                    faces = [largest_face]  # Only show the tracked face
-                    
-                    # Reset no-face timeout
-                    self.no_face_timeout = 0
+                if self.headless:
+                    # No drawing or display, commands come from stdin/socket
+                    key = self.command_source.poll()
                 else:
-                    # Handle no face detected - KEEP ROTATING to find face
-                    self.no_face_timeout += 1
+                    # Draw UI
+                    self.draw_enhanced_ui(frame, faces, command, status, intensity, error)
                     
-                    if self.no_face_timeout < self.max_no_face_frames and self.rotation_active:
-                        # AGGRESSIVELY continue rotating to find face
-                        command = self.last_direction
-                        remaining = self.max_no_face_frames - self.no_face_timeout
-                        status = f"🔍🔄 ROTATING {self.last_direction} TO FIND FACE ({remaining} frames left)"
-                        intensity = 3  # Keep rotating at good speed
-                        error = 0
-                    elif self.no_face_timeout < 30:  # Extended search time
-                        # If still no face, try opposite direction
-                        opposite_dir = 'L' if self.last_direction == 'R' else 'R'
-                        command = opposite_dir
-                        status = f"🔄 SEARCHING OPPOSITE DIRECTION: {opposite_dir}"
-                        intensity = 3
-                        error = 0
-                        if self.no_face_timeout == self.max_no_face_frames:
-                            self.last_direction = opposite_dir  # Switch direction
-                    else:
-                        # Finally stop after extended search
-                        command = 'S'
-                        status = "❌ NO FACE FOUND - STOPPED"
-                        intensity = 0
-                        error = 0
-                        self.continuous_movement = False
-                        self.rotation_active = False
-                        self.last_direction = 'S'
-                    
-                    # Clear history when no face detected
-                    self.face_history.clear()
-                
-                # Send motor command
-                self.send_motor_command(command)
-                
-                # Update performance metrics
-                self.update_fps()
-                
-                # Draw UI
-                self.draw_enhanced_ui(frame, faces, command, status, intensity, error)
-                
-                # Display frame
-                cv2.imshow('Enhanced Face Motor Controller', frame)
+                    # Display frame
+                    cv2.imshow('Enhanced Face Motor Controller', frame)
+                    key = cv2.waitKey(1) & 0xFF
                 
                 # Handle user input
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
+                if not self.handle_key(key):
                     break
-                elif key == ord('r'):
-                    self.face_history.clear()
-                    print("Face tracking reset")
-                elif key == ord('h'):
-                    self.send_motor_command('H')
-                    print("Homing motor...")
-                elif key == ord('i'):
-                    self.send_motor_command('I')
-                    print("Requesting motor info...")
-                elif key == ord('c'):
-                    self.frame_center_x = self.frame_width // 2
-                    print(f"Center recalibrated: {self.frame_center_x}")
         
         except KeyboardInterrupt:
             print("\nController interrupted by user")
@@ -444,26 +667,106 @@ class EnhancedFaceMotorController:
         finally:
             self.cleanup()
     
+    def handle_key(self, key):
+        """Apply a key command; returns False when the controller should quit"""
+        if key == ord('q'):
+            return False
+        elif key == ord('r'):
+            self.face_history.clear()
+            self.face_tracker.reset()
+            self.reacquisition.reset()
+            self.reacquisition.clear_history()
+            self.target_id = None
+            print("Face tracking reset")
+        elif key == ord('h'):
+            self.send_motor_command('H')
+            print("Homing motor...")
+        elif key == ord('i'):
+            self.send_motor_command('I')
+            print("Requesting motor info...")
+        elif key == ord('c'):
+            self.frame_center_x = self.frame_width // 2
+            print(f"Center recalibrated: {self.frame_center_x}")
+        return True
+    
+    def calibrate(self):
+        """Fit and save the pixel-per-step model; the camera must see a static scene"""
+        print("Calibrating: keep the scene in front of the camera still...")
+        model = PixelStepCalibrator(self).run()
+        model.save(self.calibration_file)
+        self.pixel_step_model = model
+        print(f"Calibration saved to {self.calibration_file}: {model.pixels_per_step:+.3f} px/step "
+              f"(rms {model.rms_px:.2f}px over {model.samples} moves)")
+        return model
+    
     def cleanup(self):
         """Clean up resources"""
         print("Cleaning up...")
         
         # Stop motor
         if self.arduino and self.arduino.is_open:
-            self.send_motor_command('S')
+            self._queue_serial('S')  # Also cancels framed motion
             time.sleep(0.1)
         
+        # Stop serial thread before closing the port
+        self._stop_event.set()
+        self.serial_thread.join(timeout=1.0)
+        
         # Close resources
         if self.cap:
             self.cap.release()
         if self.arduino and self.arduino.is_open:
             self.arduino.close()
-        cv2.destroyAllWindows()
+        if self.command_source:
+            self.command_source.close()
+        if self.exit_recorder:
+            self.exit_recorder.close()
+            print(f"Logged {self.exit_recorder.exits_written} face exits to {self.exit_recorder.path}")
+        if not self.headless:
+            try:
+                cv2.destroyAllWindows()
+            except cv2.error:
+                pass  # OpenCV built without GUI support
         
         print("Cleanup completed")
 
 def main():
-    controller = EnhancedFaceMotorController()
+    parser = argparse.ArgumentParser(description="Enhanced face tracking motor controller")
+    parser.add_argument('--port', default='COM10', help="Arduino serial port")
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--target-policy', default='sticky', choices=['sticky', 'largest', 'center'])
+    parser.add_argument('--legacy-protocol', action='store_true',
+                        help="Use single-character motor commands only")
+    parser.add_argument('--headless', action='store_true',
+                        help="No window or overlay; read R/H/I/C/Q commands from stdin")
+    parser.add_argument('--control-port', type=int,
+                        help="In headless mode, also accept commands on this localhost TCP port")
+    parser.add_argument('--ui-hz', type=float, default=10.0, help="Max overlay text refresh rate")
+    parser.add_argument('--fov', type=float, default=60.0, help="Camera horizontal field of view in degrees")
+    parser.add_argument('--calibration-file', default='calibration.json')
+    parser.add_argument('--exit-log', help="Append face exits (exit_id,t,face_deg) to this CSV for the benchmark")
+    parser.add_argument('--calibrate', action='store_true',
+                        help="Measure pixels per motor step against a static scene, save it and exit")
+    args = parser.parse_args()
+    
+    controller = EnhancedFaceMotorController(com_port=args.port, baud_rate=args.baud,
+                                             target_policy=args.target_policy,
+                                             use_framed_protocol=not args.legacy_protocol,
+                                             headless=args.headless,
+                                             control_port=args.control_port,
+                                             ui_hz=args.ui_hz,
+                                             camera_fov_deg=args.fov,
+                                             calibration_file=args.calibration_file,
+                                             exit_log=args.exit_log)
+    if args.calibrate:
+        try:
+            controller.calibrate()
+        except RuntimeError as e:
+            print(f"Calibration failed: {e}")
+        finally:
+            controller.cleanup()
+        return
+    
     controller.run()
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import cv2
 import time
+from multi_face_tracker import MultiFaceTracker
 
 # Initialize face detector
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
@@ -7,6 +8,10 @@ face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_fronta
 # Start webcam
 cap = cv2.VideoCapture(0)
 
+# Keep following the same face when several are in view
+tracker = MultiFaceTracker(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                           policy='sticky')
+
 # Open log file
 log_file = open("face_log.txt", "w")
 log_file.write("Timestamp, X, Y, Width, Height\n")
@@ -22,7 +27,11 @@ while True:
     # Detect faces
     faces = face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
 
-    for (x, y, w, h) in faces:
+    target = tracker.update(faces)
+
+    if target is not None:
+        x, y, w, h = target.box
+
         # Draw bounding box
         cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
@@ -31,12 +40,10 @@ while True:
         log_file.write(f"{timestamp}, {x}, {y}, {w}, {h}\n")
 
         # Display timestamp and coordinates on screen
-        info_text = f"{timestamp} | X:{x} Y:{y} W:{w} H:{h}"
+        info_text = f"{timestamp} | ID:{target.track_id} X:{x} Y:{y} W:{w} H:{h}"
         cv2.putText(frame, info_text, (10, 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
-        break  # Only track the first detected face
-
     # Display the frame
     cv2.imshow('Face Tracker', frame)
 
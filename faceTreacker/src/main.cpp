@@ -22,6 +22,70 @@ long currentPosition = 0;
 const long maxPosition = 1024;     // Maximum steps in each direction
 const long minPosition = -1024;
 
+// Framed motion protocol v1 (see motion_protocol.py)
+//   Command: 0xA5 | version | seq | cmd | len | payload[len] | crc8
+//   Status:  0xB5 | version | seq | flags | pos:i16 | min:i16 | max:i16 | crc8
+// Start bytes are outside ASCII so frames coexist with legacy L/R/S/H/I commands.
+const uint8_t FRAME_START = 0xA5;
+const uint8_t STATUS_START = 0xB5;
+const uint8_t PROTOCOL_VERSION = 1;
+const uint8_t MAX_PAYLOAD = 4;
+
+const uint8_t CMD_STOP = 0x01;
+const uint8_t CMD_MOVE_TO = 0x02;
+const uint8_t CMD_MOVE_BY = 0x03;
+const uint8_t CMD_VELOCITY = 0x04;
+const uint8_t CMD_INFO = 0x05;
+const uint8_t CMD_HOME = 0x06;
+
+const uint8_t FLAG_MOVING = 0x01;
+const uint8_t FLAG_AT_LIMIT = 0x02;
+const uint8_t FLAG_VELOCITY_MODE = 0x04;
+const uint8_t FLAG_BAD_FRAME = 0x08;
+
+// Frame parser state
+enum ParserState { WAIT_START, READ_VERSION, READ_SEQ, READ_CMD, READ_LEN, READ_PAYLOAD, READ_CHECKSUM };
+ParserState parserState = WAIT_START;
+uint8_t frameVersion = 0;
+uint8_t frameSeq = 0;
+uint8_t frameCmd = 0;
+uint8_t frameLen = 0;
+uint8_t framePayload[MAX_PAYLOAD];
+uint8_t payloadIndex = 0;
+uint8_t frameCrc = 0;
+unsigned long frameStartMillis = 0;
+const unsigned long frameTimeout = 50;      // Drop partial frames after this many ms
+
+// Non-blocking motion driven by framed commands
+enum MotionMode { MODE_IDLE, MODE_POSITION, MODE_VELOCITY };
+MotionMode motionMode = MODE_IDLE;
+long targetPosition = 0;
+int targetVelocity = 0;                     // Steps per second, sign = direction
+bool atLimit = false;
+uint8_t lastSeq = 0;
+unsigned long lastFrameMillis = 0;
+unsigned long lastStepMicros = 0;
+unsigned long velocityStepMicros = 0;
+const unsigned long velocityTimeout = 500;  // Stop velocity mode without keepalive
+const long maxStepRate = (long)speedFast * stepsPerRevolution / 60;   // Steps per second
+const long slowStepRate = (long)speedSlow * stepsPerRevolution / 60;
+const unsigned long fastStepMicros = 1000000UL / maxStepRate;
+const unsigned long slowStepMicros = 1000000UL / slowStepRate;
+
+// Forward declarations
+void processMovementCommand(char command);
+int calculateStepSize();
+void homeMotor();
+void discardLegacyBytes();
+uint8_t crc8Update(uint8_t crc, uint8_t data);
+void feedFrameParser(uint8_t data);
+void handleFrame();
+void setTargetPosition(long position);
+void setTargetVelocity(int velocity);
+void serviceMotion();
+void stepOnce(int direction);
+void sendStatus(uint8_t seq, uint8_t extraFlags);
+
 void setup() {
   Serial.begin(9600);
   myStepper.setSpeed(speedSlow);
@@ -40,21 +104,30 @@ void setup() {
   myStepper.step(-50);  // Return to start
   
   Serial.println("Motor test complete");
-  Serial.println("Arduino Ready - Send L/R/S/H/I commands");
+  Serial.println("Arduino Ready - Send L/R/S/H/I commands or v1 frames");
 }
 
 void loop() {
-  if (Serial.available() > 0) {
+  // Drop a partial frame if the rest never arrives
+  if (parserState != WAIT_START && millis() - frameStartMillis > frameTimeout) {
+    parserState = WAIT_START;
+  }
+  
+  while (Serial.available() > 0) {
+    // Framed commands are never subject to the legacy cooldown
+    if (parserState != WAIT_START || Serial.peek() == FRAME_START) {
+      feedFrameParser(Serial.read());
+      continue;
+    }
+    
     char command = Serial.read();
     unsigned long currentTime = millis();
     
     // Check command cooldown to prevent overwhelming the motor
     if (currentTime - lastCommandTime < commandCooldown) {
-      // Clear remaining buffer and return
-      while (Serial.available() > 0) {
-        Serial.read();
-      }
-      return;
+      // Discard queued legacy bytes, keep any frame that follows
+      discardLegacyBytes();
+      break;
     }
     
     // Process command
@@ -63,10 +136,17 @@ void loop() {
     // Update timing
     lastCommandTime = currentTime;
     
-    // Clear any remaining bytes in buffer
-    while (Serial.available() > 0) {
-      Serial.read();
-    }
+    // Clear any remaining legacy bytes in buffer
+    discardLegacyBytes();
+    break;
+  }
+  
+  serviceMotion();
+}
+
+void discardLegacyBytes() {
+  while (Serial.available() > 0 && Serial.peek() != FRAME_START) {
+    Serial.read();
   }
 }
 
@@ -74,6 +154,11 @@ void processMovementCommand(char command) {
   int stepSize = 0;
   int motorSpeed = speedSlow;
   
+  // Legacy movement commands take over from framed motion
+  if (command != 'I') {
+    motionMode = MODE_IDLE;
+  }
+  
   // Track consecutive commands for adaptive stepping
   if (command == lastCommand && command != 'S') {
     consecutiveCommands++;
@@ -211,4 +296,214 @@ void homeMotor() {
   currentPosition = 0;
   consecutiveCommands = 0;
   Serial.println("HOME:COMPLETE");
-}
\ No newline at end of file
+}
+
+uint8_t crc8Update(uint8_t crc, uint8_t data) {
+  // CRC-8, polynomial 0x07 (matches crc8() in motion_protocol.py)
+  crc ^= data;
+  for (uint8_t i = 0; i < 8; i++) {
+    crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+  }
+  return crc;
+}
+
+void feedFrameParser(uint8_t data) {
+  switch (parserState) {
+    case WAIT_START:
+      if (data == FRAME_START) {
+        frameCrc = 0;
+        frameStartMillis = millis();
+        parserState = READ_VERSION;
+      }
+      return;
+      
+    case READ_VERSION:
+      frameVersion = data;
+      parserState = READ_SEQ;
+      break;
+      
+    case READ_SEQ:
+      frameSeq = data;
+      parserState = READ_CMD;
+      break;
+      
+    case READ_CMD:
+      frameCmd = data;
+      parserState = READ_LEN;
+      break;
+      
+    case READ_LEN:
+      frameLen = data;
+      payloadIndex = 0;
+      if (frameLen > MAX_PAYLOAD) {
+        parserState = WAIT_START;
+        sendStatus(frameSeq, FLAG_BAD_FRAME);
+        return;
+      }
+      parserState = (frameLen > 0) ? READ_PAYLOAD : READ_CHECKSUM;
+      break;
+      
+    case READ_PAYLOAD:
+      framePayload[payloadIndex++] = data;
+      if (payloadIndex >= frameLen) {
+        parserState = READ_CHECKSUM;
+      }
+      break;
+      
+    case READ_CHECKSUM:
+      parserState = WAIT_START;
+      if (data == frameCrc && frameVersion == PROTOCOL_VERSION) {
+        handleFrame();
+      } else {
+        sendStatus(frameSeq, FLAG_BAD_FRAME);
+      }
+      return;
+  }
+  
+  frameCrc = crc8Update(frameCrc, data);
+}
+
+void handleFrame() {
+  int value = 0;
+  if (frameLen >= 2) {
+    value = (int16_t)(framePayload[0] | ((uint16_t)framePayload[1] << 8));
+  }
+  
+  lastSeq = frameSeq;
+  lastFrameMillis = millis();
+  
+  switch (frameCmd) {
+    case CMD_STOP:
+      motionMode = MODE_IDLE;
+      break;
+      
+    case CMD_MOVE_TO:
+      setTargetPosition(value);
+      break;
+      
+    case CMD_MOVE_BY:
+      setTargetPosition(currentPosition + value);
+      break;
+      
+    case CMD_VELOCITY:
+      setTargetVelocity(value);
+      break;
+      
+    case CMD_INFO:
+      break;
+      
+    case CMD_HOME:
+      setTargetPosition(0);
+      break;
+      
+    default:
+      sendStatus(frameSeq, FLAG_BAD_FRAME);
+      return;
+  }
+  
+  // Every valid frame is acknowledged with a status reply
+  sendStatus(frameSeq, 0);
+}
+
+void setTargetPosition(long position) {
+  atLimit = (position < minPosition || position > maxPosition);
+  targetPosition = constrain(position, minPosition, maxPosition);
+  consecutiveCommands = 0;
+  myStepper.setSpeed(speedFast);  // Step timing is handled by serviceMotion()
+  motionMode = MODE_POSITION;
+}
+
+void setTargetVelocity(int velocity) {
+  atLimit = false;
+  targetVelocity = constrain(velocity, -maxStepRate, maxStepRate);
+  if (targetVelocity == 0) {
+    motionMode = MODE_IDLE;
+    return;
+  }
+  velocityStepMicros = 1000000UL / abs(targetVelocity);
+  consecutiveCommands = 0;
+  myStepper.setSpeed(speedFast);
+  motionMode = MODE_VELOCITY;
+}
+
+void serviceMotion() {
+  if (motionMode == MODE_IDLE) {
+    return;
+  }
+  
+  unsigned long now = micros();
+  
+  if (motionMode == MODE_VELOCITY) {
+    // Watchdog: the host must keep refreshing velocity commands
+    if (millis() - lastFrameMillis > velocityTimeout) {
+      motionMode = MODE_IDLE;
+      sendStatus(lastSeq, 0);
+      return;
+    }
+    if (now - lastStepMicros < velocityStepMicros) {
+      return;
+    }
+    
+    int direction = (targetVelocity > 0) ? 1 : -1;
+    if (currentPosition + direction > maxPosition || currentPosition + direction < minPosition) {
+      motionMode = MODE_IDLE;
+      atLimit = true;
+      sendStatus(lastSeq, 0);
+      return;
+    }
+    
+    stepOnce(direction);
+    lastStepMicros = now;
+    return;
+  }
+  
+  // Position mode: full speed, slow down for the last few steps
+  long remaining = targetPosition - currentPosition;
+  if (remaining == 0) {
+    motionMode = MODE_IDLE;
+    sendStatus(lastSeq, 0);  // Report arrival
+    return;
+  }
+  
+  unsigned long interval = (labs(remaining) > baseStepSize) ? fastStepMicros : slowStepMicros;
+  if (now - lastStepMicros < interval) {
+    return;
+  }
+  
+  stepOnce(remaining > 0 ? 1 : -1);
+  lastStepMicros = now;
+}
+
+void stepOnce(int direction) {
+  myStepper.step(direction);
+  currentPosition += direction;
+}
+
+void writeInt16(uint8_t *buffer, int value) {
+  buffer[0] = (uint8_t)(value & 0xFF);
+  buffer[1] = (uint8_t)((value >> 8) & 0xFF);
+}
+
+void sendStatus(uint8_t seq, uint8_t extraFlags) {
+  uint8_t flags = extraFlags;
+  if (motionMode != MODE_IDLE) flags |= FLAG_MOVING;
+  if (motionMode == MODE_VELOCITY) flags |= FLAG_VELOCITY_MODE;
+  if (atLimit) flags |= FLAG_AT_LIMIT;
+  
+  uint8_t buffer[11];
+  buffer[0] = STATUS_START;
+  buffer[1] = PROTOCOL_VERSION;
+  buffer[2] = seq;
+  buffer[3] = flags;
+  writeInt16(&buffer[4], (int)currentPosition);
+  writeInt16(&buffer[6], (int)minPosition);
+  writeInt16(&buffer[8], (int)maxPosition);
+  
+  uint8_t crc = 0;
+  for (uint8_t i = 1; i < 10; i++) {
+    crc = crc8Update(crc, buffer[i]);
+  }
+  buffer[10] = crc;
+  
+  Serial.write(buffer, sizeof(buffer));
+}
@@ -0,0 +1,150 @@
+"""Framed motion protocol (v1) shared by the controllers and faceTreacker firmware
+
+Host -> Arduino command frame:
+
+    0xA5 | version | seq | cmd | len | payload[len] | crc8
+
+Arduino -> host status reply (11 bytes):
+
+    0xB5 | version | seq | flags | position:i16 | min:i16 | max:i16 | crc8
+
+Integers are little-endian, the CRC-8 (poly 0x07) covers everything after
+the start byte. Both start bytes are outside 7-bit ASCII, so frames can
+share the line with the legacy single-character L/R/S/H/I commands and
+the firmware's text replies.
+"""
+import struct
+from collections import namedtuple
+
+PROTOCOL_VERSION = 1
+
+FRAME_START = 0xA5    # Host -> Arduino
+STATUS_START = 0xB5   # Arduino -> host
+MAX_PAYLOAD = 4
+
+# Commands
+CMD_STOP = 0x01       # Stop any framed motion
+CMD_MOVE_TO = 0x02    # Goal position in steps (i16)
+CMD_MOVE_BY = 0x03    # Relative move in steps (i16)
+CMD_VELOCITY = 0x04   # Signed velocity in steps/s (i16), needs keepalive
+CMD_INFO = 0x05       # Status only
+CMD_HOME = 0x06       # Goal position 0
+
+# Status flags
+FLAG_MOVING = 0x01
+FLAG_AT_LIMIT = 0x02
+FLAG_VELOCITY_MODE = 0x04
+FLAG_BAD_FRAME = 0x08
+
+STATUS_FORMAT = '<BBBBhhhB'
+STATUS_SIZE = struct.calcsize(STATUS_FORMAT)
+
+MotorStatus = namedtuple('MotorStatus', ['version', 'seq', 'flags', 'position',
+                                         'min_position', 'max_position'])
+
+
+def crc8(data):
+    """CRC-8 with polynomial 0x07, matching crc8Update() in main.cpp"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def encode_command(seq, cmd, value=None):
+    """Build a command frame; value is an optional signed 16-bit argument"""
+    payload = b'' if value is None else struct.pack('<h', max(-32768, min(32767, int(value))))
+    body = bytes([PROTOCOL_VERSION, seq & 0xFF, cmd, len(payload)]) + payload
+    return bytes([FRAME_START]) + body + bytes([crc8(body)])
+
+
+def decode_command(frame):
+    """Parse a command frame into (seq, cmd, value), or None if it is invalid"""
+    if len(frame) < 6 or frame[0] != FRAME_START:
+        return None
+    length = frame[4]
+    if length > MAX_PAYLOAD or len(frame) != 6 + length:
+        return None
+    body = frame[1:-1]
+    if crc8(body) != frame[-1] or frame[1] != PROTOCOL_VERSION:
+        return None
+    value = struct.unpack('<h', frame[5:7])[0] if length >= 2 else None
+    return frame[2], frame[3], value
+
+
+def encode_status(seq, flags, position, min_position, max_position):
+    """Build a status reply (used by the simulated Arduino)"""
+    body = struct.pack('<BBBhhh', PROTOCOL_VERSION, seq & 0xFF, flags,
+                       position, min_position, max_position)
+    return bytes([STATUS_START]) + body + bytes([crc8(body)])
+
+
+def decode_status(frame):
+    """Parse an 11-byte status reply, or return None if it is invalid"""
+    if len(frame) != STATUS_SIZE or frame[0] != STATUS_START:
+        return None
+    if crc8(frame[1:-1]) != frame[-1]:
+        return None
+    _, version, seq, flags, position, min_position, max_position, _ = struct.unpack(STATUS_FORMAT, frame)
+    return MotorStatus(version, seq, flags, position, min_position, max_position)
+
+
+class FrameEncoder:
+    """Encodes command frames with a rolling 8-bit sequence number"""
+
+    def __init__(self):
+        self.seq = 0
+
+    def encode(self, cmd, value=None):
+        """Return (seq, frame bytes) for the next command"""
+        self.seq = (self.seq + 1) & 0xFF
+        return self.seq, encode_command(self.seq, cmd, value)
+
+
+class ResponseParser:
+    """Splits the Arduino byte stream into text lines and MotorStatus replies"""
+
+    def __init__(self, max_buffer=1024):
+        self._buffer = bytearray()
+        self.max_buffer = max_buffer
+        self.bad_frames = 0
+
+    def feed(self, data):
+        """Add received bytes and return the complete items, in order"""
+        self._buffer.extend(data)
+        items = []
+
+        while self._buffer:
+            if self._buffer[0] == STATUS_START:
+                if len(self._buffer) < STATUS_SIZE:
+                    break
+                status = decode_status(bytes(self._buffer[:STATUS_SIZE]))
+                if status is None:
+                    # Corrupt frame, resync on the next byte
+                    self.bad_frames += 1
+                    del self._buffer[0]
+                    continue
+                del self._buffer[:STATUS_SIZE]
+                items.append(status)
+                continue
+
+            newline = self._buffer.find(b'\n')
+            status_start = self._buffer.find(bytes([STATUS_START]))
+            if status_start != -1 and (newline == -1 or status_start < newline):
+                end, skip = status_start, 0
+            elif newline != -1:
+                end, skip = newline, 1
+            else:
+                # Incomplete line, wait for more data unless the buffer is runaway
+                if len(self._buffer) > self.max_buffer:
+                    self._buffer.clear()
+                break
+
+            line = self._buffer[:end].decode('ascii', errors='ignore').strip()
+            del self._buffer[:end + skip]
+            if line:
+                items.append(line)
+
+        return items
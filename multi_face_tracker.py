@@ -0,0 +1,201 @@
+import numpy as np
+
+
+class Track:
+    """A single tracked face with a stable ID"""
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = tuple(int(v) for v in box)  # (x, y, w, h)
+        self.age = 1        # Frames since the track was created
+        self.hits = 1       # Frames with a matched detection
+        self.misses = 0     # Consecutive frames without a detection
+
+    @property
+    def center(self):
+        x, y, w, h = self.box
+        return (x + w // 2, y + h // 2)
+
+    @property
+    def area(self):
+        return self.box[2] * self.box[3]
+
+    @property
+    def visible(self):
+        """True when the track was matched in the latest frame"""
+        return self.misses == 0
+
+    def update(self, box):
+        self.box = tuple(int(v) for v in box)
+        self.age += 1
+        self.hits += 1
+        self.misses = 0
+
+    def mark_missed(self):
+        self.age += 1
+        self.misses += 1
+
+
+class MultiFaceTracker:
+    """Associates face detections to persistent tracks across frames
+
+    Detections are matched to tracks with a vectorized cost matrix built
+    from IoU and normalized center distance, then assigned greedily by
+    lowest cost. One track is selected as the motor target according to
+    the configured policy:
+      - 'sticky':  keep the current target while its track is alive,
+                   fall back to the largest face when it is lost
+      - 'largest': the largest visible face every frame
+      - 'center':  the visible face closest to the frame center
+    """
+
+    POLICIES = ('sticky', 'largest', 'center')
+
+    def __init__(self, frame_width, frame_height, policy='sticky',
+                 iou_threshold=0.2, max_center_distance=1.0,
+                 max_misses=5, min_hits=1):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown target policy: {policy!r} (expected one of {self.POLICIES})")
+
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.policy = policy
+
+        # Association gates
+        self.iou_threshold = iou_threshold              # Minimum overlap to match
+        self.max_center_distance = max_center_distance  # In units of track width
+        self.max_misses = max_misses                    # Frames before a track is dropped
+        self.min_hits = min_hits                        # Hits before a track can become target
+
+        self.tracks = []
+        self.target_id = None
+        self._next_id = 1
+
+    def reset(self):
+        """Drop all tracks and the current target"""
+        self.tracks = []
+        self.target_id = None
+
+    def shift(self, dx, dy=0):
+        """Move every track by (dx, dy) pixels, e.g. after the camera panned"""
+        for track in self.tracks:
+            x, y, w, h = track.box
+            track.box = (int(round(x + dx)), int(round(y + dy)), w, h)
+
+    def update(self, faces):
+        """Update tracks with this frame's detections and return the target track
+
+        Returns the selected Track if it was detected in this frame, else None.
+        """
+        detections = np.asarray(faces, dtype=np.float32).reshape(-1, 4)
+
+        matched_tracks, matched_dets = self._associate(detections)
+
+        for t_idx, d_idx in zip(matched_tracks, matched_dets):
+            self.tracks[t_idx].update(detections[d_idx])
+
+        matched_track_set = set(matched_tracks)
+        for t_idx, track in enumerate(self.tracks):
+            if t_idx not in matched_track_set:
+                track.mark_missed()
+
+        matched_det_set = set(matched_dets)
+        for d_idx in range(len(detections)):
+            if d_idx not in matched_det_set:
+                self.tracks.append(Track(self._next_id, detections[d_idx]))
+                self._next_id += 1
+
+        # Drop stale tracks
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        return self._select_target()
+
+    def _associate(self, detections):
+        """Greedy assignment on an IoU + center-distance cost matrix"""
+        if not self.tracks or len(detections) == 0:
+            return [], []
+
+        track_boxes = np.array([t.box for t in self.tracks], dtype=np.float32)
+
+        iou = self._iou_matrix(track_boxes, detections)
+
+        # Center distance normalized by track width
+        track_centers = track_boxes[:, :2] + track_boxes[:, 2:] / 2
+        det_centers = detections[:, :2] + detections[:, 2:] / 2
+        diff = track_centers[:, None, :] - det_centers[None, :, :]
+        dist = np.sqrt((diff ** 2).sum(axis=2)) / np.maximum(track_boxes[:, 2:3], 1.0)
+
+        cost = (1.0 - iou) + 0.5 * np.minimum(dist, 2.0)
+        gated = (iou < self.iou_threshold) & (dist > self.max_center_distance)
+        cost[gated] = np.inf
+
+        matched_tracks, matched_dets = [], []
+        used_tracks = np.zeros(cost.shape[0], dtype=bool)
+        used_dets = np.zeros(cost.shape[1], dtype=bool)
+
+        # Visit candidate pairs from lowest to highest cost
+        order = np.argsort(cost, axis=None)
+        for flat_idx in order:
+            t_idx, d_idx = np.unravel_index(flat_idx, cost.shape)
+            if not np.isfinite(cost[t_idx, d_idx]):
+                break
+            if used_tracks[t_idx] or used_dets[d_idx]:
+                continue
+            used_tracks[t_idx] = True
+            used_dets[d_idx] = True
+            matched_tracks.append(int(t_idx))
+            matched_dets.append(int(d_idx))
+
+        return matched_tracks, matched_dets
+
+    @staticmethod
+    def _iou_matrix(boxes_a, boxes_b):
+        """Pairwise IoU between two (N, 4) arrays of (x, y, w, h) boxes"""
+        a_x1 = boxes_a[:, None, 0]
+        a_y1 = boxes_a[:, None, 1]
+        a_x2 = a_x1 + boxes_a[:, None, 2]
+        a_y2 = a_y1 + boxes_a[:, None, 3]
+        b_x1 = boxes_b[None, :, 0]
+        b_y1 = boxes_b[None, :, 1]
+        b_x2 = b_x1 + boxes_b[None, :, 2]
+        b_y2 = b_y1 + boxes_b[None, :, 3]
+
+        inter_w = np.clip(np.minimum(a_x2, b_x2) - np.maximum(a_x1, b_x1), 0, None)
+        inter_h = np.clip(np.minimum(a_y2, b_y2) - np.maximum(a_y1, b_y1), 0, None)
+        inter = inter_w * inter_h
+
+        area_a = boxes_a[:, None, 2] * boxes_a[:, None, 3]
+        area_b = boxes_b[None, :, 2] * boxes_b[None, :, 3]
+        union = area_a + area_b - inter
+
+        return inter / np.maximum(union, 1e-6)
+
+    def _select_target(self):
+        """Pick the target track according to the policy"""
+        candidates = [t for t in self.tracks if t.visible and t.hits >= self.min_hits]
+
+        if self.policy == 'sticky' and self.target_id is not None:
+            track = self.get_track(self.target_id)
+            if track is not None:
+                # Keep the lock while the track is alive, even if briefly missed
+                return track if track.visible else None
+            self.target_id = None
+
+        if not candidates:
+            self.target_id = None
+            return None
+
+        if self.policy == 'center':
+            center_x = self.frame_width / 2
+            target = min(candidates, key=lambda t: abs(t.center[0] - center_x))
+        else:
+            target = max(candidates, key=lambda t: t.area)
+
+        self.target_id = target.track_id
+        return target
+
+    def get_track(self, track_id):
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
@@ -3,6 +3,7 @@ import serial
 import time
 import numpy as np
 from collections import deque
+from multi_face_tracker import MultiFaceTracker
 
 class PreciseFaceTracker:
     def __init__(self, com_port='COM8', baud_rate=9600):
@@ -35,6 +36,8 @@ class PreciseFaceTracker:
         # Tracking parameters
         self.deadband = 30  # Reduced deadband for more precision
         self.face_history = deque(maxlen=10)  # For temporal smoothing
+        self.face_tracker = MultiFaceTracker(self.frame_width, self.frame_height, policy='sticky')
+        self.target_id = None
         self.last_command_time = time.time()
         self.command_interval = 0.05  # Minimum time between commands (50ms)
         
@@ -173,16 +176,20 @@ class PreciseFaceTracker:
                 status = "No face detected"
                 intensity = 0
                 
-                if len(faces) > 0:
-                    # Use the largest face (most likely to be the main subject)
-                    largest_face = max(faces, key=lambda face: face[2] * face[3])
-                    x, y, w, h = largest_face
-                    face_center_x = x + w // 2
+                # Follow the same face across frames instead of whichever is largest
+                target = self.face_tracker.update(faces)
+                
+                if target is not None:
+                    if target.track_id != self.target_id:
+                        self.face_history.clear()
+                        self.target_id = target.track_id
+                    
+                    face_center_x = target.center[0]
                     
                     direction, status, intensity = self.calculate_direction(face_center_x)
                     
-                    # Only consider faces array with the largest face for display
-                    faces = [largest_face]
+                    # Only consider faces array with the tracked face for display
+                    faces = [target.box]
                 
                 else:
                     # Clear history when no face is detected
@@ -203,6 +210,8 @@ class PreciseFaceTracker:
                     break
                 elif key == ord('r'):
                     self.face_history.clear()
+                    self.face_tracker.reset()
+                    self.target_id = None
                     print("Face tracking history reset")
                 elif key == ord('c'):
                     # Recalibrate center
@@ -0,0 +1,289 @@
+import csv
+import os
+from collections import deque, namedtuple
+
+import numpy as np
+
+# One decision per missed frame: motor command, phase name, status text,
+# and the column range (x0, x1) where the face is expected to re-enter
+SearchAction = namedtuple('SearchAction', ['command', 'phase', 'status', 'roi'])
+
+
+class ReacquisitionPlanner:
+    """Plans the search sweep after the tracked face is lost
+
+    While the face is visible, its position is kept in motor coordinates
+    (steps) using the camera field of view, so its velocity is the real
+    angular velocity even while the motor is turning. When it is lost the
+    planner builds a list of motor waypoints:
+
+      1. coast:  follow the extrapolated face position for a short time,
+                 which rides out detector dropouts
+      2. pursue: sweep past the predicted position in the exit direction
+      3. back:   sweep the other side of the last known position
+      4. park:   return to the last known position and stop
+
+    Waypoints are clamped to motor_limits, and each one has a timeout so
+    the plan keeps moving when position feedback is missing. The command
+    mapping matches the controller: 'R' increases motor_position and
+    brings faces on the left of the mirrored frame toward the center.
+    """
+
+    def __init__(self, frame_width, fov_degrees=60.0, steps_per_revolution=2048,
+                 search_velocity=300.0, coast_time=0.3, min_sweep_degrees=20.0,
+                 prediction_horizon=1.5, edge_fraction=0.35, full_frame_interval=3):
+        self.frame_width = frame_width
+        self.frame_center_x = frame_width // 2
+        self.steps_per_pixel = (fov_degrees / frame_width) * (steps_per_revolution / 360.0)
+        self.half_fov_steps = (fov_degrees / 2.0) * steps_per_revolution / 360.0
+
+        self.search_velocity = search_velocity      # Motor steps/s while searching
+        self.coast_time = coast_time                # Seconds following the prediction
+        self.min_sweep_steps = min_sweep_degrees * steps_per_revolution / 360.0
+        self.prediction_horizon = prediction_horizon  # Max seconds to extrapolate
+        self.edge_fraction = edge_fraction          # Width of the re-entry strip
+        self.full_frame_interval = full_frame_interval  # Full-frame detection every N frames
+
+        self.tolerance_steps = 10
+        self._observations = deque(maxlen=10)  # (time, face position in steps)
+        self.reset()
+
+    def reset(self):
+        """Forget the current search (observations are kept)"""
+        self.active = False
+        self._waypoints = []
+        self._waypoint_deadline = 0.0
+        self._coast_until = 0.0
+        self._lost_time = None
+        self._last_position = 0.0
+        self._last_seen_time = 0.0
+        self._velocity = 0.0
+        self._exit_dir = 0
+        self._limits = (-1024, 1024)
+        self.frames_searched = 0
+
+    def clear_history(self):
+        self._observations.clear()
+
+    def face_position_steps(self, face_center_x, motor_position):
+        """Face angle in motor steps; faces left of center are at larger positions"""
+        return motor_position - (face_center_x - self.frame_center_x) * self.steps_per_pixel
+
+    def observe(self, face_center_x, motor_position, timestamp):
+        """Record a sighting of the tracked face"""
+        self._observations.append((timestamp, self.face_position_steps(face_center_x, motor_position)))
+        self.active = False
+
+    def estimate_velocity(self):
+        """Face angular velocity in steps/s from a linear fit over recent sightings"""
+        if len(self._observations) < 3:
+            return 0.0
+        obs = np.array(self._observations)
+        t = obs[:, 0] - obs[-1, 0]
+        if t[-1] - t[0] <= 0:
+            return 0.0
+        slope = np.polyfit(t, obs[:, 1], 1)[0]
+        return float(slope)
+
+    def start(self, motor_position, motor_limits, timestamp):
+        """Plan a search at the moment the face is lost"""
+        self.reset()
+        self.active = True
+        self._lost_time = timestamp
+        self._limits = (motor_limits['min'], motor_limits['max'])
+
+        if not self._observations:
+            return  # Nothing known, step() will hold still
+
+        last_time, last_position = self._observations[-1]
+        self._velocity = self.estimate_velocity()
+        self._last_position = last_position
+        self._last_seen_time = last_time
+
+        # Exit direction: where it was heading, else which side of center it was on
+        if abs(self._velocity) > 20.0:
+            self._exit_dir = 1 if self._velocity > 0 else -1
+        elif last_position != motor_position:
+            self._exit_dir = 1 if last_position > motor_position else -1
+        else:
+            self._exit_dir = 1
+
+        self._coast_until = timestamp + self.coast_time
+
+        # Sweep far enough past the prediction to cover the horizon
+        reach = max(self.min_sweep_steps, abs(self._velocity) * self.prediction_horizon)
+        pursue = last_position + self._exit_dir * reach
+        back = last_position - self._exit_dir * self.min_sweep_steps
+        self._waypoints = [('pursue', self._clamp(pursue)),
+                           ('back', self._clamp(back)),
+                           ('park', self._clamp(last_position))]
+        self._waypoint_deadline = 0.0  # Set when the waypoint becomes current
+
+    def _clamp(self, position):
+        return float(min(max(position, self._limits[0]), self._limits[1]))
+
+    def predicted_position(self, timestamp):
+        """Extrapolated face position, capped at the prediction horizon"""
+        dt = min(max(timestamp - self._last_seen_time, 0.0), self.prediction_horizon)
+        return self._last_position + self._velocity * dt
+
+    def predicted_column(self, motor_position, timestamp):
+        """Frame column where the extrapolated face position would appear"""
+        offset = (motor_position - self.predicted_position(timestamp)) / self.steps_per_pixel
+        return self.frame_center_x + offset
+
+    def _roi_for_direction(self, direction, motor_position, timestamp):
+        """Frame strip where a face re-enters while the motor turns this way
+
+        Returns None (full frame) while the predicted face column is still
+        inside the frame, so a face that never left is not searched for only
+        on full-frame passes.
+        """
+        if 0 <= self.predicted_column(motor_position, timestamp) < self.frame_width:
+            return None
+        strip = int(self.frame_width * self.edge_fraction)
+        if direction > 0:
+            return (0, strip)  # Turning 'R' brings faces in from the left edge
+        return (self.frame_width - strip, self.frame_width)
+
+    def _move_toward(self, target, motor_position):
+        if target > motor_position + self.tolerance_steps:
+            return 'R', 1
+        if target < motor_position - self.tolerance_steps:
+            return 'L', -1
+        return 'S', 0
+
+    def step(self, motor_position, timestamp):
+        """Decide the search action for one frame without the face"""
+        self.frames_searched += 1
+
+        if not self.active or not self._observations:
+            return SearchAction('S', 'idle', "No face detected", None)
+
+        # 1. Coast on the prediction
+        if timestamp < self._coast_until:
+            target = self._clamp(self.predicted_position(timestamp))
+            command, _ = self._move_toward(target, motor_position)
+            # The face may not have left at all: search the whole frame
+            return SearchAction(command, 'coast', f"🔮 FOLLOWING PREDICTION {command}", None)
+
+        # 2-4. Waypoint sweeps
+        while self._waypoints:
+            phase, target = self._waypoints[0]
+            if not self._waypoint_deadline:
+                distance = abs(target - motor_position)
+                self._waypoint_deadline = timestamp + 1.5 * distance / self.search_velocity + 0.3
+
+            at_limit = ((target >= self._limits[1] and motor_position >= self._limits[1] - self.tolerance_steps)
+                        or (target <= self._limits[0] and motor_position <= self._limits[0] + self.tolerance_steps))
+            reached = abs(target - motor_position) <= self.tolerance_steps or at_limit
+            if reached or timestamp >= self._waypoint_deadline:
+                self._waypoints.pop(0)
+                self._waypoint_deadline = 0.0
+                continue
+
+            command, direction = self._move_toward(target, motor_position)
+            roi = self._roi_for_direction(direction, motor_position, timestamp)
+            if phase == 'pursue':
+                status = f"🔍 SWEEPING {command} PAST PREDICTION"
+            elif phase == 'back':
+                status = f"🔄 SWEEPING BACK {command}"
+            else:
+                status = "↩️ RETURNING TO LAST POSITION"
+            return SearchAction(command, phase, status, roi)
+
+        return SearchAction('S', 'done', "❌ NO FACE FOUND - STOPPED", None)
+
+    def use_full_frame(self):
+        """Whether this search frame should run full-frame detection"""
+        return self.frames_searched % self.full_frame_interval == 0
+
+
+class ExitRecorder:
+    """Logs face exits as exit_id,t,face_deg rows for benchmark_reacquisition.py
+
+    Keeps the last few seconds of sightings (face angle relative to motor
+    home). When the face is lost for longer than a detector dropout, those
+    sightings start an exit record; sightings after reacquisition are added
+    for post_time seconds, then the exit is written. Exits that are never
+    reacquired are written after max_search_time. Times are relative to the
+    first sample of each exit.
+    """
+
+    def __init__(self, path, steps_per_revolution=2048, history_time=3.0,
+                 post_time=2.0, max_search_time=10.0, min_missed_frames=3):
+        self.path = path
+        self.degrees_per_step = 360.0 / steps_per_revolution
+        self.history_time = history_time
+        self.post_time = post_time
+        self.max_search_time = max_search_time
+        self.min_missed_frames = min_missed_frames  # Shorter gaps are dropouts, not exits
+
+        self._history = deque()   # (time, face_deg) while tracking
+        self._exit = None         # Samples of the exit being recorded
+        self._lost_time = None
+        self._found_time = None
+        self._missed = 0
+        self.exits_written = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='')
+        self._csv = csv.writer(self._file)
+        if new_file:
+            self._csv.writerow(['exit_id', 't', 'face_deg'])
+        self._exit_id = self._next_exit_id(path) if not new_file else 1
+
+    @staticmethod
+    def _next_exit_id(path):
+        """Continue numbering after the exits already in the file"""
+        last = 0
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    last = max(last, int(row['exit_id']))
+                except (KeyError, ValueError):
+                    continue
+        return last + 1
+
+    def sighting(self, face_steps, timestamp):
+        """Record the tracked face at face_steps (motor coordinates)"""
+        sample = (timestamp, face_steps * self.degrees_per_step)
+        self._missed = 0
+
+        if self._exit is not None:
+            self._exit.append(sample)
+            if self._found_time is None:
+                self._found_time = timestamp
+            elif timestamp - self._found_time >= self.post_time:
+                self._write_exit()
+            return
+
+        self._history.append(sample)
+        while self._history and timestamp - self._history[0][0] > self.history_time:
+            self._history.popleft()
+
+    def missed(self, timestamp):
+        """Record a frame without the tracked face"""
+        self._missed += 1
+        if self._exit is None:
+            if self._missed >= self.min_missed_frames and self._history:
+                self._exit = list(self._history)
+                self._lost_time = timestamp
+                self._found_time = None
+                self._history.clear()
+        elif self._found_time is None and timestamp - self._lost_time >= self.max_search_time:
+            self._write_exit()  # Never reacquired
+
+    def _write_exit(self):
+        t0 = self._exit[0][0]
+        for t, face_deg in self._exit:
+            self._csv.writerow([self._exit_id, f"{t - t0:.3f}", f"{face_deg:.2f}"])
+        self._file.flush()
+        self._exit_id += 1
+        self.exits_written += 1
+        self._exit = None
+
+    def close(self):
+        if self._exit is not None and self._found_time is not None:
+            self._write_exit()
+        self._file.close()
@@ -0,0 +1,367 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from motion_protocol import (CMD_HOME, CMD_INFO, CMD_MOVE_BY, CMD_MOVE_TO, CMD_STOP,
+                             CMD_VELOCITY, FLAG_AT_LIMIT, FLAG_BAD_FRAME, FLAG_MOVING,
+                             FLAG_VELOCITY_MODE, FRAME_START, decode_command, encode_status)
+
+
+class SimulatedArduino:
+    """In-memory stand-in for the serial port of the faceTreacker firmware
+
+    Implements the parts of the pyserial API the controllers use
+    (write/flush/read/readline/in_waiting/is_open/close) and mimics main.cpp:
+    progressive step sizes, position limits, the 30 ms command cooldown,
+    the text feedback lines and the framed v1 protocol. Framed goal
+    positions are reached instantly unless goal_step_rate (steps/s) is set,
+    in which case they report MOVING until arrival like the firmware;
+    velocity mode integrates over time.
+    """
+
+    def __init__(self, min_position=-1024, max_position=1024,
+                 base_step_size=20, max_step_size=100, command_cooldown=0.03,
+                 max_step_rate=614, velocity_timeout=0.5, goal_step_rate=None):
+        self.is_open = True
+        self.min_position = min_position
+        self.max_position = max_position
+        self.base_step_size = base_step_size
+        self.max_step_size = max_step_size
+        self.command_cooldown = command_cooldown
+
+        self.position = 0
+        self.last_command = 'S'
+        self.consecutive_commands = 0
+        self.last_command_time = 0.0
+
+        # Framed protocol state
+        self.max_step_rate = max_step_rate
+        self.velocity_timeout = velocity_timeout
+        self.velocity = 0
+        self.goal_step_rate = goal_step_rate
+        self.goal = None  # Goal position while a timed move is running
+        self.at_limit = False
+        self.last_seq = 0
+        self._position_accum = 0.0
+        self._last_motion_time = time.monotonic()
+        self._last_frame_time = 0.0
+
+        # Bytes waiting for the host, capped like a real driver buffer
+        self._rx = bytearray()
+        self._rx_limit = 4096
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.bytes_written = 0
+        self.commands_processed = 0
+        self.commands_dropped = 0
+        self.frames_processed = 0
+
+    @property
+    def in_waiting(self):
+        self._advance_motion()
+        with self._lock:
+            return len(self._rx)
+
+    def write(self, data):
+        if not self.is_open:
+            raise OSError("Simulated port is closed")
+        self.bytes_written += len(data)
+        self._advance_motion()
+
+        if data[0] == FRAME_START:
+            # Framed commands bypass the legacy cooldown
+            self._process_frame(bytes(data))
+            return len(data)
+
+        now = time.monotonic()
+        if now - self.last_command_time < self.command_cooldown:
+            # Firmware discards everything that arrives inside the cooldown
+            self.commands_dropped += len(data)
+            return len(data)
+
+        # Firmware processes the first byte and flushes the rest
+        self._process_command(chr(data[0]))
+        self.commands_dropped += len(data) - 1
+        self.last_command_time = now
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def read(self, size=1):
+        with self._lock:
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+        return data
+
+    def readline(self):
+        with self._lock:
+            end = self._rx.find(b'\n')
+            if end < 0:
+                line = bytes(self._rx)
+                self._rx.clear()
+            else:
+                line = bytes(self._rx[:end + 1])
+                del self._rx[:end + 1]
+        return line
+
+    def close(self):
+        self.is_open = False
+
+    def _reply(self, text):
+        self._reply_bytes(text.encode() + b'\r\n')
+
+    def _reply_bytes(self, data):
+        with self._lock:
+            self._rx.extend(data)
+            overflow = len(self._rx) - self._rx_limit
+            if overflow > 0:
+                del self._rx[:overflow]
+
+    def _send_status(self, seq, extra_flags=0):
+        flags = extra_flags
+        if self.velocity:
+            flags |= FLAG_MOVING | FLAG_VELOCITY_MODE
+        elif self.goal is not None:
+            flags |= FLAG_MOVING
+        if self.at_limit:
+            flags |= FLAG_AT_LIMIT
+        self._reply_bytes(encode_status(seq, flags, self.position,
+                                        self.min_position, self.max_position))
+
+    def _process_frame(self, frame):
+        decoded = decode_command(frame)
+        if decoded is None:
+            self._send_status(frame[2] if len(frame) > 2 else 0, FLAG_BAD_FRAME)
+            return
+
+        seq, cmd, value = decoded
+        self.last_seq = seq
+        self._last_frame_time = time.monotonic()
+        self.frames_processed += 1
+
+        if cmd == CMD_STOP:
+            self.velocity = 0
+            self.goal = None
+        elif cmd in (CMD_MOVE_TO, CMD_MOVE_BY, CMD_HOME):
+            if cmd == CMD_MOVE_TO:
+                target = value or 0
+            elif cmd == CMD_MOVE_BY:
+                target = self.position + (value or 0)
+            else:
+                target = 0
+            self.velocity = 0
+            self.at_limit = not (self.min_position <= target <= self.max_position)
+            target = max(self.min_position, min(self.max_position, target))
+            if self.goal_step_rate:
+                self.goal = target
+                self._position_accum = 0.0
+            else:
+                self.position = target
+        elif cmd == CMD_VELOCITY:
+            self.goal = None
+            self.at_limit = False
+            self.velocity = max(-self.max_step_rate, min(self.max_step_rate, value or 0))
+            self._position_accum = 0.0
+        elif cmd != CMD_INFO:
+            self._send_status(seq, FLAG_BAD_FRAME)
+            return
+
+        self._send_status(seq)
+
+    def _advance_motion(self):
+        """Integrate velocity mode up to now, honouring limits and the watchdog"""
+        now = time.monotonic()
+        elapsed = now - self._last_motion_time
+        self._last_motion_time = now
+        if self.goal is not None:
+            self._advance_goal(elapsed)
+            return
+        if not self.velocity:
+            return
+
+        if now - self._last_frame_time > self.velocity_timeout:
+            elapsed = max(0.0, elapsed - (now - self._last_frame_time - self.velocity_timeout))
+            self._integrate(elapsed)
+            self.velocity = 0
+            self._send_status(self.last_seq)
+            return
+        self._integrate(elapsed)
+
+    def _advance_goal(self, elapsed):
+        self._position_accum += self.goal_step_rate * elapsed
+        steps = int(self._position_accum)
+        self._position_accum -= steps
+        remaining = self.goal - self.position
+        if abs(remaining) <= steps:
+            self.position = self.goal
+            self.goal = None
+            self._send_status(self.last_seq)  # Report arrival
+        else:
+            self.position += steps if remaining > 0 else -steps
+
+    def _integrate(self, elapsed):
+        self._position_accum += self.velocity * elapsed
+        steps = int(self._position_accum)
+        self._position_accum -= steps
+        new_position = self.position + steps
+        if not (self.min_position <= new_position <= self.max_position):
+            self.position = max(self.min_position, min(self.max_position, new_position))
+            self.velocity = 0
+            self.at_limit = True
+            self._send_status(self.last_seq)
+            return
+        self.position = new_position
+
+    def _process_command(self, command):
+        # Legacy movement commands take over from framed motion
+        if command != 'I':
+            self.velocity = 0
+            self.goal = None
+
+        if command == self.last_command and command != 'S':
+            self.consecutive_commands += 1
+        else:
+            self.consecutive_commands = 0
+
+        if command in ('L', 'R'):
+            step_size = min(self.base_step_size + self.consecutive_commands * 8, self.max_step_size)
+            sign = -1 if command == 'L' else 1
+            new_position = self.position + sign * step_size
+            if self.min_position <= new_position <= self.max_position:
+                self.position = new_position
+                self._reply(f"{command}:{step_size},P:{self.position}")
+            else:
+                self._reply(f"{command}:LIMIT_REACHED")
+        elif command == 'S':
+            self._reply("S:STOP")
+        elif command == 'H':
+            self.position = 0
+            self.consecutive_commands = 0
+            self._reply("HOME:COMPLETE")
+        elif command == 'I':
+            self._reply(f"INFO:P:{self.position},L:{self.min_position},R:{self.max_position}")
+        else:
+            self._reply("ERROR:INVALID_COMMAND")
+
+        self.last_command = command
+        self.commands_processed += 1
+
+
+class SyntheticCapture:
+    """VideoCapture-like source producing generated frames
+
+    A drawn face that the Haar cascade detects drifts back and forth over a
+    noisy background, running partly off both edges so the face is lost
+    and reacquired every pass. Detection, tracking, motor commands and the
+    reacquisition search all do real work.
+    """
+
+    FACE_SIZE = 130
+
+    def __init__(self, width=640, height=480, fps=30.0, seed=0, speed=4):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.speed = speed  # Pixels per frame
+        self.frame_index = 0
+        self._opened = True
+
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(0, 96, size=(height, width, 3), dtype=np.uint8)
+        self._face = self._draw_face(self.FACE_SIZE)
+
+    @staticmethod
+    def _draw_face(size):
+        """Schematic face: dark eyes and brows over bright cheeks, nose, mouth"""
+        patch = np.full((size, size), 110, dtype=np.uint8)
+        scale = size / 100.0
+
+        def pt(x, y):
+            return int(x * scale), int(y * scale)
+
+        def ln(v):
+            return max(1, int(v * scale))
+
+        skin = 210
+        cv2.ellipse(patch, pt(50, 52), (ln(40), ln(50)), 0, 0, 360, skin, -1)
+        for eye_x in (33, 67):
+            cv2.ellipse(patch, pt(eye_x, 44), (ln(12), ln(6)), 0, 0, 360, 30, -1)
+            cv2.line(patch, pt(eye_x - 10, 35), pt(eye_x + 10, 34), 40, ln(3))
+        cv2.ellipse(patch, pt(50, 65), (ln(5), ln(3)), 0, 0, 360, skin - 60, -1)
+        cv2.ellipse(patch, pt(50, 78), (ln(14), ln(4)), 0, 0, 360, 50, -1)
+        patch = cv2.GaussianBlur(patch, (7, 7), 0)
+        return cv2.cvtColor(patch, cv2.COLOR_GRAY2BGR)
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop_id, value):
+        return False  # Fixed geometry
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def face_x(self):
+        """Left edge of the face in the current frame (may be off-frame)"""
+        # Bounce between positions where the face is mostly off either edge
+        x_min = -self.FACE_SIZE // 2 - 60
+        span = self.width + 120 - x_min - self.FACE_SIZE // 2
+        phase = (self.frame_index * self.speed) % (2 * span)
+        return x_min + (phase if phase < span else 2 * span - phase)
+
+    def read(self):
+        if not self._opened:
+            return False, None
+
+        frame = self._background.copy()
+        x = self.face_x()
+        y = (self.height - self.FACE_SIZE) // 2
+        x0, x1 = max(x, 0), min(x + self.FACE_SIZE, self.width)
+        if x1 > x0:
+            frame[y:y + self.FACE_SIZE, x0:x1] = self._face[:, x0 - x:x1 - x]
+
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+class RecordedCapture:
+    """Loops a recorded video file forever"""
+
+    def __init__(self, path):
+        self.path = path
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise IOError(f"Cannot open recording: {path}")
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def set(self, prop_id, value):
+        return False  # Recorded geometry is fixed
+
+    def get(self, prop_id):
+        return self._cap.get(prop_id)
+
+    def read(self):
+        ret, frame = self._cap.read()
+        if not ret:
+            # Rewind at end of file
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read()
+        return ret, frame
+
+    def release(self):
+        self._cap.release()
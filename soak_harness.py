@@ -0,0 +1,259 @@
+"""Long-running soak test for EnhancedFaceMotorController
+
+Drives the controller for hours with synthetic or recorded frames and a
+simulated serial port, sampling memory, threads, queue depths and
+per-frame latency. Exits non-zero when memory grows or latency drifts
+beyond the configured bounds.
+
+    python soak_harness.py --duration 8h
+    python soak_harness.py --duration 30m --video recording.mp4 --csv soak.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from enhanced_face_motor_controller import EnhancedFaceMotorController
+from simulated_hardware import RecordedCapture, SimulatedArduino, SyntheticCapture
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def parse_duration(text):
+    """Parse '90', '90s', '30m' or '8h' into seconds"""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def read_rss_mb():
+    """Current resident set size in MB"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    # Last resort: peak RSS (KB on Linux), still catches monotonic growth
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SoakMonitor:
+    """Collects periodic samples and checks them against drift bounds"""
+
+    FIELDS = ['elapsed_s', 'frames', 'rss_mb', 'threads', 'serial_queue',
+              'latency_p50_ms', 'latency_p99_ms']
+
+    def __init__(self, controller, warmup_s, max_rss_growth_mb, max_p99_drift,
+                 max_queue_depth, csv_path=None):
+        self.controller = controller
+        self.warmup_s = warmup_s
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.max_p99_drift = max_p99_drift
+        self.max_queue_depth = max_queue_depth
+
+        self.samples = []
+        self.frames = 0
+        self.tracked_frames = 0   # Frames where the tracker reported a target
+        self.search_frames = 0    # Frames spent in the reacquisition search
+        self.max_serial_depth = 0
+        self._window = []  # Latencies since the last sample (ms)
+
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, 'w', newline='')
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(self.FIELDS)
+
+    def record_frame(self, latency_s, tracked=False):
+        self.frames += 1
+        self.tracked_frames += tracked
+        self.search_frames += self.controller.reacquisition.active
+        self._window.append(latency_s * 1000.0)
+
+        # Queue depth is cheap to read, track its peak every frame
+        self.max_serial_depth = max(self.max_serial_depth, self.controller.serial_queue.qsize())
+
+    def take_sample(self, elapsed_s):
+        if not self._window:
+            return  # No frames since the last sample
+        latencies = np.array(self._window)
+        self._window = []
+
+        sample = {
+            'elapsed_s': round(elapsed_s, 1),
+            'frames': self.frames,
+            'rss_mb': round(read_rss_mb(), 2),
+            'threads': threading.active_count(),
+            'serial_queue': self.controller.serial_queue.qsize(),
+            'latency_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'latency_p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        }
+        self.samples.append(sample)
+
+        print(f"[{sample['elapsed_s']:>9.1f}s] frames={sample['frames']} "
+              f"rss={sample['rss_mb']:.1f}MB threads={sample['threads']} "
+              f"serial_queue={sample['serial_queue']} "
+              f"p50={sample['latency_p50_ms']:.2f}ms p99={sample['latency_p99_ms']:.2f}ms")
+
+        if self._csv:
+            self._csv.writerow([sample[field] for field in self.FIELDS])
+            self._csv_file.flush()
+
+    def evaluate(self):
+        """Return a list of failure messages (empty when the run passed)"""
+        failures = []
+
+        steady = [s for s in self.samples if s['elapsed_s'] >= self.warmup_s]
+        if len(steady) < 2:
+            return ["Not enough samples after warmup to evaluate drift"]
+
+        # Compare the median of the first and last few windows to ride out noise
+        n = min(3, len(steady) // 2)
+        head, tail = steady[:n], steady[-n:]
+
+        rss_start = float(np.median([s['rss_mb'] for s in head]))
+        rss_end = float(np.median([s['rss_mb'] for s in tail]))
+        if rss_end - rss_start > self.max_rss_growth_mb:
+            failures.append(f"RSS grew {rss_end - rss_start:.1f}MB "
+                            f"({rss_start:.1f} -> {rss_end:.1f}MB, limit {self.max_rss_growth_mb}MB)")
+
+        p99_start = float(np.median([s['latency_p99_ms'] for s in head]))
+        p99_end = float(np.median([s['latency_p99_ms'] for s in tail]))
+        p99_limit = p99_start * (1.0 + self.max_p99_drift) + 1.0  # 1ms absolute slack
+        if p99_end > p99_limit:
+            failures.append(f"p99 latency drifted {p99_start:.2f} -> {p99_end:.2f}ms "
+                            f"(limit {p99_limit:.2f}ms)")
+
+        threads_start = head[0]['threads']
+        threads_end = max(s['threads'] for s in tail)
+        if threads_end > threads_start:
+            failures.append(f"Thread count grew {threads_start} -> {threads_end}")
+
+        if self.max_serial_depth > self.max_queue_depth:
+            failures.append(f"serial_queue reached depth {self.max_serial_depth} "
+                            f"(limit {self.max_queue_depth})")
+
+        return failures
+
+    def close(self):
+        if self._csv_file:
+            self._csv_file.close()
+
+
+def run_soak(args):
+    arduino = SimulatedArduino()
+    capture = RecordedCapture(args.video) if args.video else SyntheticCapture(fps=args.fps or 30.0)
+    controller = EnhancedFaceMotorController(arduino=arduino, capture=capture,
+                                             target_policy=args.target_policy,
+                                             use_framed_protocol=not args.legacy_protocol,
+                                             calibration_file=args.calibration_file)
+
+    duration_s = parse_duration(args.duration)
+    warmup_s = args.warmup if args.warmup is not None else min(300.0, duration_s * 0.1)
+    monitor = SoakMonitor(controller, warmup_s, args.max_rss_growth_mb, args.max_p99_drift,
+                          args.max_queue_depth, csv_path=args.csv)
+
+    controller.request_protocol_handshake()
+    frame_period = 1.0 / args.fps if args.fps > 0 else 0.0
+    print(f"Soak test: {duration_s:.0f}s, warmup {warmup_s:.0f}s, "
+          f"sampling every {args.sample_interval:.0f}s, "
+          f"{'unpaced' if frame_period == 0 else f'{args.fps:.0f} FPS'}")
+
+    start = time.monotonic()
+    next_sample = start + args.sample_interval
+    next_frame = start
+
+    try:
+        while True:
+            now = time.monotonic()
+            if now - start >= duration_s:
+                break
+
+            ret, frame = controller.cap.read()
+            if not ret:
+                print("Frame source ended")
+                break
+
+            t0 = time.perf_counter()
+            frame, faces, command, status, intensity, error = controller.process_frame(frame)
+            if not args.no_ui:
+                controller.draw_enhanced_ui(frame, faces, command, status, intensity, error)
+            monitor.record_frame(time.perf_counter() - t0, tracked=controller.no_face_timeout == 0)
+
+            now = time.monotonic()
+            if now >= next_sample:
+                monitor.take_sample(now - start)
+                next_sample += args.sample_interval
+
+            if frame_period:
+                next_frame += frame_period
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.monotonic()  # Fell behind, don't try to catch up
+
+    except KeyboardInterrupt:
+        print("\nSoak test interrupted, evaluating collected samples")
+
+    finally:
+        monitor.take_sample(time.monotonic() - start)
+        controller.cleanup()
+        monitor.close()
+
+    print(f"Paths exercised: {monitor.tracked_frames}/{monitor.frames} frames tracking, "
+          f"{monitor.search_frames} searching")
+    print(f"Simulated Arduino: {arduino.commands_processed} legacy commands processed, "
+          f"{arduino.commands_dropped} bytes dropped in cooldown, "
+          f"{arduino.frames_processed} frames, {arduino.bytes_written} bytes written")
+
+    failures = monitor.evaluate()
+    if failures:
+        print("SOAK TEST FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print("SOAK TEST PASSED")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', default='4h', help="Run length, e.g. 900, 30m, 8h (default 4h)")
+    parser.add_argument('--video', help="Recorded video to loop instead of synthetic frames")
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame pacing, 0 = as fast as possible")
+    parser.add_argument('--sample-interval', type=float, default=30.0, help="Seconds between samples")
+    parser.add_argument('--warmup', type=float, help="Seconds excluded from drift baselines")
+    parser.add_argument('--max-rss-growth-mb', type=float, default=25.0)
+    parser.add_argument('--max-p99-drift', type=float, default=0.5,
+                        help="Allowed relative p99 latency increase (0.5 = +50%%)")
+    parser.add_argument('--max-queue-depth', type=int, default=32)
+    parser.add_argument('--target-policy', default='sticky', choices=['sticky', 'largest', 'center'])
+    parser.add_argument('--legacy-protocol', action='store_true',
+                        help="Drive the motor with single-character commands only")
+    parser.add_argument('--calibration-file',
+                        help="Pixel-per-step calibration to soak step targeting (default: velocity control)")
+    parser.add_argument('--no-ui', action='store_true', help="Skip overlay drawing in the measured loop")
+    parser.add_argument('--csv', help="Write samples to this CSV file")
+    args = parser.parse_args()
+
+    sys.exit(run_soak(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import queue
+import socket
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class OverlayRenderer:
+    """Draws the controller overlay onto frames with minimal per-frame work
+
+    The status panel background, border and help line are rendered once.
+    Text is re-rendered into a cached copy of the panel only when the
+    displayed values change, and at most ui_hz times per second; every
+    frame then costs one slice copy plus the guide lines. Long status
+    lines run past the panel onto the frame, as they always did; those
+    overflow pixels are kept as a sparse list and copied separately.
+    """
+
+    PANEL_ORIGIN = (5, 5)
+    PANEL_SIZE = (396, 156)  # Width, height (matches the old (5,5)-(400,160) box)
+
+    def __init__(self, frame_width, frame_height, ui_hz=10.0):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.ui_hz = ui_hz
+
+        self._panel_base = self._render_static_panel()
+        # Text is drawn on a strip reaching the right frame edge; only the
+        # panel part is copied whole, overflowing glyph pixels are indexed
+        strip_width = max(self.PANEL_SIZE[0], frame_width - self.PANEL_ORIGIN[0])
+        self._strip = np.zeros((self.PANEL_SIZE[1], strip_width, 3), dtype=np.uint8)
+        self._strip_mask = np.zeros(self._strip.shape[:2], dtype=np.uint8)
+        self._panel = self._strip[:, :self.PANEL_SIZE[0]]
+        np.copyto(self._panel, self._panel_base)
+        self._overflow = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+        self._text_state = None
+        self._last_text_time = 0.0
+
+        # Guide geometry is cached until the center or deadband changes
+        self._guides_key = None
+        self._guide_columns = None
+
+    def _render_static_panel(self):
+        width, height = self.PANEL_SIZE
+        panel = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.rectangle(panel, (0, 0), (width - 1, height - 1), (255, 255, 255), 1)
+        cv2.putText(panel, "Controls: Q=Quit, R=Reset, H=Home, I=Info",
+                    (5, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        return panel
+
+    def _render_text(self, status, error, deadband, motor_position, command, connected, fps):
+        np.copyto(self._panel, self._panel_base)
+        self._strip_mask.fill(0)
+
+        conn_color = (0, 255, 0) if connected else (0, 0, 255)
+        conn_status = "Connected" if connected else "Disconnected"
+        lines = [
+            (f"Status: {status}", (5, 20), 0.6, (0, 255, 0), 2),
+            (f"Error: {error:+d}px | Deadband: ±{deadband}", (5, 45), 0.5, (255, 255, 255), 1),
+            (f"Motor Pos: {motor_position} | Cmd: {command}", (5, 65), 0.5, (255, 255, 255), 1),
+            (f"Arduino: {conn_status} | FPS: {fps:.1f}", (5, 85), 0.5, conn_color, 1),
+        ]
+        for text, origin, scale, color, thickness in lines:
+            cv2.putText(self._strip, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cv2.putText(self._strip_mask, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+
+        panel_width = self.PANEL_SIZE[0]
+        rows, cols = np.nonzero(self._strip_mask[:, panel_width:])
+        self._overflow = (rows, cols + panel_width)
+
+    def _draw_guides(self, frame, center_x, deadband):
+        key = (center_x, deadband)
+        if key != self._guides_key:
+            left = max(0, center_x - deadband)
+            right = min(self.frame_width - 1, center_x + deadband)
+            center = min(max(center_x, 0), self.frame_width - 1)
+            self._guide_columns = (center, left, right)
+            self._guides_key = key
+
+        center, left, right = self._guide_columns
+        frame[:, center] = (0, 255, 255)   # Center line
+        frame[0, left:right + 1] = (0, 255, 0)  # Deadband box (bottom edge is off-frame)
+        frame[:, left] = (0, 255, 0)
+        frame[:, right] = (0, 255, 0)
+
+    def draw(self, frame, faces, center_x, deadband, status, error,
+             motor_position, command, connected, fps):
+        self._draw_guides(frame, center_x, deadband)
+
+        for i, (x, y, w, h) in enumerate(faces):
+            # Face rectangle with confidence-based color
+            confidence_color = (0, 255, 0) if w * h > 5000 else (0, 165, 255)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), confidence_color, 2)
+            cv2.circle(frame, (x + w // 2, y + h // 2), 3, (0, 0, 255), -1)
+            cv2.putText(frame, f'Face {i+1} ({w}x{h})', (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, confidence_color, 1)
+
+        # Refresh text only when something visible changed, capped at ui_hz
+        text_state = (status, int(error), deadband, motor_position, command, bool(connected), round(fps, 1))
+        now = time.monotonic()
+        if text_state != self._text_state and (self._text_state is None
+                                                or now - self._last_text_time >= 1.0 / self.ui_hz):
+            self._render_text(*text_state)
+            self._text_state = text_state
+            self._last_text_time = now
+
+        # Blit the cached panel, clipped to the frame
+        x0, y0 = self.PANEL_ORIGIN
+        height = min(self._panel.shape[0], frame.shape[0] - y0)
+        width = min(self._panel.shape[1], frame.shape[1] - x0)
+        if height > 0 and width > 0:
+            frame[y0:y0 + height, x0:x0 + width] = self._panel[:height, :width]
+
+        rows, cols = self._overflow
+        if rows.size:
+            keep = (rows + y0 < frame.shape[0]) & (cols + x0 < frame.shape[1])
+            rows, cols = rows[keep], cols[keep]
+            frame[rows + y0, cols + x0] = self._strip[rows, cols]
+
+
+class HeadlessCommandSource:
+    """Delivers the R/H/I/C/Q key commands without a display window
+
+    Commands are single characters read from stdin and/or from a TCP
+    socket bound to localhost, e.g. `echo h | nc 127.0.0.1 8765`.
+    """
+
+    VALID_KEYS = 'qrhic'
+
+    def __init__(self, use_stdin=True, control_port=None):
+        self._keys = queue.Queue(maxsize=32)
+        self._stop_event = threading.Event()
+        self._server = None
+
+        if use_stdin and sys.stdin is not None and not sys.stdin.closed:
+            threading.Thread(target=self._read_stdin, daemon=True).start()
+
+        if control_port is not None:
+            self._server = socket.create_server(('127.0.0.1', control_port))
+            self._server.settimeout(0.5)
+            threading.Thread(target=self._serve_socket, daemon=True).start()
+            print(f"Headless control socket listening on 127.0.0.1:{control_port}")
+
+    def _push(self, text):
+        for char in text.lower():
+            if char in self.VALID_KEYS:
+                try:
+                    self._keys.put_nowait(char)
+                except queue.Full:
+                    pass  # Nobody is consuming, drop rather than grow
+
+    def _read_stdin(self):
+        for line in sys.stdin:
+            if self._stop_event.is_set():
+                break
+            self._push(line)
+
+    def _serve_socket(self):
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Server closed
+
+            with conn:
+                conn.settimeout(0.5)
+                while not self._stop_event.is_set():
+                    try:
+                        data = conn.recv(64)
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    self._push(data.decode('ascii', errors='ignore'))
+
+    def poll(self):
+        """Return the next key code (like cv2.waitKey) or None"""
+        try:
+            return ord(self._keys.get_nowait())
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._stop_event.set()
+        if self._server:
+            self._server.close()